@@ -2,6 +2,8 @@
 from . import database as dbcache
 from . import emsl, ccrepo, elements, tlsutil
 from .basis_format import dumps
+import concurrent.futures
+import copy
 import datetime
 import os
 
@@ -16,38 +18,139 @@ __all__ = ["Database", "dumps"]
 available_sources = ["EMSL", "ccrepo"]
 
 
+def _download_cgto_for_atoms(elem_list, basisset, atnums, max_workers):
+    """
+    Download the contracted Gaussian functions for the given atoms
+    of a basis set from the appropriate source website.
+
+    @param max_workers  Maximal number of concurrent requests to use
+    """
+    if basisset["source"] == "EMSL":
+        # EMSL sends all atoms in one request
+        return emsl.download_cgto_for_atoms(elem_list, basisset["name"],
+                                            atnums, basisset["extra"])
+    elif basisset["source"] == "ccrepo":
+        return ccrepo.download_cgto_for_atoms(elem_list, basisset["name"],
+                                              atnums, basisset["extra"],
+                                              max_workers=max_workers)
+    else:
+        raise ValueError("Unknown basis set source: {}".format(basisset["source"]))
+
+
 class Database(dbcache.Database):
     def __init__(self, dbfile="~/.local/share/look4bas/basis_sets.db"):
+        self._cgto_cache = {}  # Cache for lookup_basisset_full
+        self._update_checked = False  # Has update() been done already?
         super().__init__(os.path.expanduser(dbfile))
 
+    def clear(self):
+        """Clear the complete database and reset to untouched state"""
+        self._update_checked = False
+        super().clear()
+
+    def cache_clear(self):
+        """
+        Clear the in-memory caches of data looked up from the database
+        or downloaded from the source websites.
+        """
+        self._cgto_cache.clear()
+        super().cache_clear()
+
     def lookup_basisset_full(self, basisset):
         """
         Lookup information about the basis set in the database and return
         the list of defined atoms and their basis functions.
         If the data is not stored in the database then it is automatically
-        downloaded on the fly.
+        downloaded on the fly and added to the database.
+        Returned data is additionally cached for the lifetime of this
+        object (see cache_clear).
 
         @param basisset     Basis set dict as returned by search_basisset or
                             basis set id.
         """
-        basisset = self.lookup_basisset(basisset)
+        return next(self.lookup_basissets_full([basisset]))
+
+    def lookup_basissets_full(self, basissets, max_workers=4):
+        """
+        Lookup the full information for a list of basis sets, i.e. perform
+        lookup_basisset_full for each of them. Basis sets, which need to be
+        downloaded, are obtained concurrently. Returns a generator, which
+        yields the basis sets in the order of the passed list.
+
+        @param basissets    List of basis set dicts as returned by search_basisset
+                            or basis set ids.
+        @param max_workers  Maximal number of concurrent requests to use for
+                            downloading
+        """
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("max_workers needs to be a positive integer")
+        basissets = [self.lookup_basisset(basisset) for basisset in basissets]
+
+        missing_atnums = []
+        for basisset in basissets:
+            missing = [at["atnum"] for at in basisset["atoms"] if not at["has_functions"]]
+            if self.__cgto_cache_key(basisset) in self._cgto_cache:
+                missing = []
+            missing_atnums.append(missing)
+
+        # The requests are split between the basis sets downloaded concurrently
+        # and the atoms of each basis set, such that at most max_workers
+        # requests are issued at once
+        n_downloads = sum(1 for missing in missing_atnums if missing)
+        n_basissets = max(1, min(max_workers, n_downloads))
+        n_atoms = max(1, max_workers // n_basissets)
+
+        # Only the downloads are done in the worker threads,
+        # the database is exclusively accessed from this thread.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_basissets) as executor:
+            downloads = []
+            for basisset, missing in zip(basissets, missing_atnums):
+                if missing:
+                    elem_list = self.lookup_element_list(basisset["source"])
+                    downloads.append(executor.submit(_download_cgto_for_atoms,
+                                                     elem_list, basisset, missing,
+                                                     n_atoms))
+                else:
+                    downloads.append(None)
+
+            for basisset, download in zip(basissets, downloads):
+                downloaded = [] if download is None else download.result()
+                yield self.__amend_basis_functions(basisset, downloaded)
+
+    @staticmethod
+    def __cgto_cache_key(basisset):
+        atnums = tuple(sorted(at["atnum"] for at in basisset["atoms"]))
+        return (basisset["source"], basisset["name"], atnums)
+
+    def __amend_basis_functions(self, basisset, downloaded):
+        """
+        Replace the atoms of the basis set dict by the atoms including
+        their basis functions, taking them from the cache, the database
+        or the list of downloaded atoms. The latter are added to the database.
+        """
+        key = self.__cgto_cache_key(basisset)
+        if key in self._cgto_cache:
+            basisset["atoms"] = copy.deepcopy(self._cgto_cache[key])
+            return basisset
+
+        # Take the atoms for which the functions are stored in the database
+        # from there, the others have been downloaded.
+        atoms = {at["atnum"]: {"atnum": at["atnum"],
+                               "functions": self.lookup_basis_functions(at["atbas_id"])}
+                 for at in basisset["atoms"] if at["has_functions"]}
+        atbas_ids = {at["atnum"]: at["atbas_id"] for at in basisset["atoms"]}
+        for atom in downloaded:
+            atoms[atom["atnum"]] = atom
 
-        # TODO Check if data exists in db if not add it.
+            # The database cannot hold ECP definitions, so atoms
+            # which have an ECP are not stored and always downloaded.
+            if "ecp" not in atom and atom["atnum"] in atbas_ids:
+                self.insert_basis_functions(atbas_ids[atom["atnum"]],
+                                            atom["functions"])
 
         atnums = [at["atnum"] for at in basisset["atoms"]]
-        elem_list = self.lookup_element_list(basisset["source"])
-
-        if basisset["source"] == "EMSL":
-            basisset["atoms"] = emsl.download_cgto_for_atoms(elem_list, basisset["name"],
-                                                             atnums, basisset["extra"])
-            # TODO write data to db
-        elif basisset["source"] == "ccrepo":
-            basisset["atoms"] = ccrepo.download_cgto_for_atoms(elem_list,
-                                                               basisset["name"],
-                                                               atnums, basisset["extra"])
-            # TODO write data to db
-        else:
-            raise ValueError("Unknown basis set source: {}".format(basisset["source"]))
+        basisset["atoms"] = [atoms[atnum] for atnum in atnums if atnum in atoms]
+        self._cgto_cache[key] = copy.deepcopy(basisset["atoms"])
         return basisset
 
     def update_from_source_sites(self):
@@ -57,47 +160,115 @@ class Database(dbcache.Database):
         This takes longer than the default update function, but there is the
         guarantee that the data is the uttermost recent.
         """
+        # Download from both sites concurrently. The database is only
+        # touched from this thread once all data has been obtained.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            emsl_data = executor.submit(emsl.download_basisset_list,
+                                        return_elements=True)
+            ccrepo_data = executor.submit(ccrepo.download_basisset_list)
+            emsl_elements, emsl_bases = emsl_data.result()
+            ccrepo_elements, ccrepo_bases = ccrepo_data.result()
+
         self.clear()
-        emsl.add_to_database(self)
-        ccrepo.add_to_database(self)
-        self.create_table_of_elements(
-            "IUPAC",
-            [e for e in elements.IUPAC_LIST if e["atnum"] > 0]
-        )
+        with self.transaction():
+            emsl.insert_basisset_list(self, emsl_elements, emsl_bases)
+            ccrepo.insert_basisset_list(self, ccrepo_elements, ccrepo_bases)
+            self.create_table_of_elements(
+                "IUPAC",
+                [e for e in elements.IUPAC_LIST if e["atnum"] > 0]
+            )
+
+            # The data is as recent as it gets
+            self.set_meta_time("last_modified")
+            self.set_meta_time("last_checked")
+
+        # Gather statistics about the indices for the query planner
+        self.conn.execute("ANALYZE")
 
     def update(self, url="https://get.michael-herbst.com/look4bas/basis_sets.db"):
         """
         Update the database, i.e. check whether a newer version
         exists on get.michael-herbst.com/look4bas/basis_sets.db
         and update accordingly.
+
+        The check is only done if the last check was more than 2 days ago
+        and only once for the lifetime of this object. Use force_update
+        to check again regardless.
         """
-        # If last update was less than 2 days ago, do nothing
-        age = datetime.datetime.utcnow() - self.timestamp
-        if age < datetime.timedelta(days=2):
+        if self._update_checked:
             return
 
-        # Else get the most recent database from the web
-        ret = tlsutil.get_tls_fallback(url)
-        if not ret.ok:
-            raise IOError("Error updating basis_set database from "
-                          "'{}'".format(url))
-        if "Last-Modified" in ret.headers:
-            try:
-                lastmodified = datetime.datetime.strptime(ret.headers["Last-Modified"],
-                                                          "%a, %d %b %Y %H:%M:%S %Z")
-            except ValueError as e:
-                raise ValueError("Error parsing last modified date from '{}': \n{}"
-                                 "".format(url, str(e)))
-
-        # Perform update only if local version is older
-        if self.timestamp < lastmodified:
-            # Close the database and overwrite the databasefile on disk
-            self.close()
-            if os.path.exists(self.dbfile):
-                os.remove(self.dbfile)
-
-            with open(self.dbfile, "wb") as f:
-                f.write(ret.content)
-
-            # Reconnect to the updated file
-            self.connect(self.dbfile)
+        # If the last check was less than 2 days ago, do nothing
+        age = datetime.datetime.utcnow() - self.get_meta_time("last_checked")
+        if age >= datetime.timedelta(days=2):
+            self.force_update(url)
+        self._update_checked = True
+
+    def force_update(self, url="https://get.michael-herbst.com/look4bas/basis_sets.db"):
+        """
+        Check whether a newer version of the database exists on
+        get.michael-herbst.com/look4bas/basis_sets.db and update accordingly,
+        independent of the time of the last update.
+        """
+        # Else get the most recent database from the web. The body is streamed,
+        # such that it is only transferred if we actually need it. Further
+        # the server is asked to only send it if it differs from ours.
+        headers = {}
+        etag = None
+        if not self.empty:
+            last_modified = self.get_meta("last_modified")
+            if last_modified is not None:
+                headers["If-Modified-Since"] = last_modified
+            if self.get_meta("url") == url:
+                etag = self.get_meta("etag")
+            if etag is not None:
+                headers["If-None-Match"] = etag
+
+        ret = tlsutil.get_tls_fallback(url, stream=True, headers=headers)
+        try:
+            if ret.status_code == 304:
+                # Not modified: Just record that we checked.
+                self.set_meta_time("last_checked")
+                return
+            if not ret.ok:
+                raise IOError("Error updating basis_set database from "
+                              "'{}'".format(url))
+
+            lastmodified = None
+            if "Last-Modified" in ret.headers:
+                try:
+                    lastmodified = dbcache._parse_http_date(ret.headers["Last-Modified"])
+                except ValueError as e:
+                    raise ValueError("Error parsing last modified date from '{}': \n{}"
+                                     "".format(url, str(e)))
+
+            # A different ETag for the same url identifies a different archive,
+            # otherwise perform update only if local version is older
+            etag_changed = etag is not None and ret.headers.get("ETag", etag) != etag
+            if etag_changed or lastmodified is None or self.timestamp < lastmodified:
+                # Download next to the databasefile first, such that
+                # a failed download leaves the current database intact
+                tmpfile = self.dbfile + ".tmp"
+                try:
+                    with open(tmpfile, "wb") as f:
+                        for chunk in ret.iter_content(chunk_size=64 * 1024):
+                            f.write(chunk)
+                except BaseException:
+                    if os.path.exists(tmpfile):
+                        os.remove(tmpfile)
+                    raise
+
+                # Close the database and replace the databasefile on disk
+                self.close()
+                os.replace(tmpfile, self.dbfile)
+
+                # Reconnect to the updated file and remember where it came from
+                self.connect(self.dbfile)
+                self.set_meta("url", url)
+                if "ETag" in ret.headers:
+                    self.set_meta("etag", ret.headers["ETag"])
+                if "Last-Modified" in ret.headers:
+                    self.set_meta("last_modified", ret.headers["Last-Modified"])
+            self.set_meta_time("last_checked")
+        finally:
+            ret.close()
@@ -1,3 +1,5 @@
+import importlib
+
 """ Dictionary of the basis set formats supported by this script,
     mapped to the default file extension used.
 """
@@ -10,6 +12,12 @@ extension = {
     "turbomole": "turbomole",
 }
 
+"""Formats supported by dumps, each implemented in the submodule of the same name"""
+__dumps_formats = ["cfour", "gaussian94", "nwchem", "orca", "qchem", "turbomole", "pyscf"]
+
+"""Packages supported by convert_to, each implemented in the submodule of the same name"""
+__convert_packages = ["pyscf"]
+
 
 def dumps(format, data, name=None, description=None):
     """
@@ -26,21 +34,13 @@ def dumps(format, data, name=None, description=None):
     as well. Not all basis set formats use this information in the
     returned string, however.
     """
-    from . import cfour, gaussian94, nwchem, orca, pyscf, qchem, turbomole
-
-    dumps = {
-        "cfour": cfour.dumps,
-        "gaussian94": gaussian94.dumps,
-        "nwchem": nwchem.dumps,
-        "orca": orca.dumps,
-        "qchem": qchem.dumps,
-        "turbomole": turbomole.dumps,
-        "pyscf": pyscf.dumps,
-    }
-    if format not in dumps:
+    if format not in __dumps_formats:
         raise NotImplementedError("dumps for format {} is not implemented."
                                   "".format(format))
-    return dumps[format](data, name=name, description=description)
+
+    # Only import the module of the requested format
+    module = importlib.import_module("." + format, __name__)
+    return module.dumps(data, name=name, description=description)
 
 
 def convert_to(package, data):
@@ -54,11 +54,9 @@ def convert_to(package, data):
     and convert them to the python datastructures used by a different
     program package.
     """
-    from . import pyscf
-    convert = {
-        "pyscf": pyscf.convert_to,
-    }
-    if package not in convert:
+    if package not in __convert_packages:
         raise NotImplementedError("convert_to for package '{}' is not implemented."
                                   "".format(package))
-    return convert[package](data)
+
+    module = importlib.import_module("." + package, __name__)
+    return module.convert_to(data)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from .. import elements
 from warnings import warn
+import io
 import look4bas
 
 
@@ -24,72 +25,67 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
                              "Created by look4bas version "
                              "{}".format(look4bas.__version__))
 
-    lines = []
+    fmt_am = "{:5d}".format
+    fmt_exp = "{:14.7f}".format
+    fmt_coeff = "{:10.7f} ".format
+    buf = io.StringIO()
+    write = buf.write
     for atom in data:
         elem = elem_list[atom["atnum"]]["symbol"]
         functions = atom["functions"]
 
-        # Construct the list of angular momenta present
-        ams = sorted(set(fun["angular_momentum"] for fun in functions))
+        # Group the functions by angular momentum
+        map_funs = {}
+        for fun in functions:
+            map_funs.setdefault(fun["angular_momentum"], []).append(fun)
+        ams = sorted(map_funs)
 
         # Number of contractions per am
-        map_ncontr = {
-            am: len([fun for fun in functions
-                     if fun["angular_momentum"] == am])
-            for am in ams
-        }
+        map_ncontr = {am: len(map_funs[am]) for am in ams}
 
         # Extract the list of (unique) exponents for each angular momentum
         map_exps = {
-            am: sorted(set(exp for fun in functions
-                           for exp in fun["exponents"]
-                           if fun["angular_momentum"] == am),
+            am: sorted(set(exp for fun in map_funs[am] for exp in fun["exponents"]),
                        reverse=True)
             for am in ams
         }
 
         # Output element, name and description
-        lines.append("{}:{}".format(elem.upper(), name.upper()))
-        lines.append(description)
-        lines.append("")  # Empty line
+        write("{}:{}\n".format(elem.upper(), name.upper()))
+        write(description + "\n")
+        write("\n")  # Empty line
 
         # Number of AMs, contractions and exponents
-        lines.append("{:3d}".format(len(ams)))
-        lines.append("".join("{:5d}".format(am) for am in ams))
-        lines.append("".join("{:5d}".format(map_ncontr[am]) for am in ams))
-        lines.append("".join("{:5d}".format(len(map_exps[am])) for am in ams))
+        write("{:3d}\n".format(len(ams)))
+        write("".join(fmt_am(am) for am in ams) + "\n")
+        write("".join(fmt_am(map_ncontr[am]) for am in ams) + "\n")
+        write("".join(fmt_am(len(map_exps[am])) for am in ams) + "\n")
 
         for am in ams:
             # Print exponents
-            str_exp = ["{:14.7f}".format(exp) for exp in map_exps[am]]
+            str_exp = [fmt_exp(exp) for exp in map_exps[am]]
             line_buffer = ""
             for i, exp in enumerate(str_exp):
                 if i % 5 == 0:
-                    lines.append(line_buffer)
+                    write(line_buffer + "\n")
                     line_buffer = ""
                 line_buffer += exp
             if line_buffer:
-                lines.append(line_buffer)
+                write(line_buffer + "\n")
+
+            # Map exponent to coefficient for each contraction. In case
+            # an exponent is repeated, the first occurrence is used.
+            map_coeffs = [dict(zip(reversed(fun["exponents"]),
+                                   reversed(fun["coefficients"])))
+                          for fun in map_funs[am]]
 
             # Print contractions as a matrix
             for exp in map_exps[am]:   # row
-                line_buffer = ""
-                for fun in functions:  # column
-                    if fun["angular_momentum"] != am:
-                        continue
-
-                    # Find appropriate coefficient (or zero)
-                    if exp in fun["exponents"]:
-                        coeff = fun["coefficients"][fun["exponents"].index(exp)]
-                    else:
-                        coeff = 0.0
-                    line_buffer += "{:10.7f} ".format(coeff)
-
-                lines.append(line_buffer)
+                # Find appropriate coefficient (or zero) for each column
+                write("".join(fmt_coeff(coeffs.get(exp, 0.0)) for coeffs in map_coeffs))
+                write("\n")
 
         # Finish atom with empty line
-        lines.append("")
+        write("\n")
 
-    # Finish basis sets with empty line
-    lines.append("")
-    return "\n".join(lines)
+    return buf.getvalue()
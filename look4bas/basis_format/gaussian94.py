@@ -2,6 +2,7 @@
 from .. import elements
 from warnings import warn
 from .constants import NUMBER_TO_AM
+import io
 
 
 def __float_fortran(string):
@@ -30,14 +31,14 @@ def __parse_contractions(lines, *outputs):
                              "Culprit line is '{}'".format(line))
 
 
-def __parse_element_block(block, elem_symbols_lower):
+def __parse_element_block(block, symbol_to_atnum):
     ret = {"functions": []}
     lines = [__strip_comments(l) for l in block.split("\n")]
     lines = [l for l in lines if len(l) > 0]
 
     symbol, _ = lines[0].split(maxsplit=1)
     try:
-        ret["atnum"] = elem_symbols_lower.index(symbol.lower())
+        ret["atnum"] = symbol_to_atnum[symbol.lower()]
     except KeyError:
         raise ValueError("Element block starting with invalid element symbol "
                          "{}".format(symbol))
@@ -98,7 +99,7 @@ def __parse_element_block(block, elem_symbols_lower):
     return ret
 
 
-def __is_ecp_section(final_block, cgtos, elem_symbols_lower):
+def __is_ecp_section(final_block, cgtos, symbol_to_atnum):
     # final_block is an ECP section, if the 0th line
     # marks an element, which already exists in the cgtos array.
     # Furthermore the 1th and 4th line should have exactly
@@ -116,13 +117,13 @@ def __is_ecp_section(final_block, cgtos, elem_symbols_lower):
 
     element = line0[0].strip().lower()
     try:
-        atnum = elem_symbols_lower.index(element.lower())
+        atnum = symbol_to_atnum[element.lower()]
     except KeyError:  # Not a valid element symbol
         return False
     return atnum in cgtos  # Atnum should have appeared already
 
 
-def __parse_ecp_section(ecp_block, elem_symbols_lower):
+def __parse_ecp_section(ecp_block, symbol_to_atnum):
     lines = ecp_block.split("\n")
 
     # Loop to parse one record at a time
@@ -146,7 +147,7 @@ def __parse_ecp_section(ecp_block, elem_symbols_lower):
         if line0[1].strip() != "0":
             raise ValueError(error + ": Unexpected format in first line.")
         try:
-            record["atnum"] = elem_symbols_lower.index(line0[0].lower())
+            record["atnum"] = symbol_to_atnum[line0[0].lower()]
         except KeyError:
             raise ValueError("Block starting with invalid element symbol "
                              "{}".format(line0[0]))
@@ -276,21 +277,23 @@ def loads(string, elem_list=elements.IUPAC_LIST):
     # Since ECPs are appended to the final "****", it could happen that there is
     # indeed valid content after the final "****"
 
-    # Convert the elem_list to all-lower-case
-    elem_symbols_lower = [e["symbol"].lower() for e in elem_list]
+    # Map the all-lower-case symbols of the elem_list to the atomic numbers
+    symbol_to_atnum = {}
+    for atnum, elem in enumerate(elem_list):
+        symbol_to_atnum.setdefault(elem["symbol"].lower(), atnum)
 
     # The first and last block are just comments or trailing newlines or
     # ECP definitions and can be ignored for getting the cgto information
     cgtos = {}
     for block in blocks[1:-1]:
-        elem = __parse_element_block(block, elem_symbols_lower)
+        elem = __parse_element_block(block, symbol_to_atnum)
         cgtos[elem["atnum"]] = elem
 
     final_block = __strip_comments(blocks[-1])
     if len(final_block) == 0:
         ecps = {}
-    elif __is_ecp_section(final_block, cgtos, elem_symbols_lower):
-        ecps = __parse_ecp_section(final_block, elem_symbols_lower)
+    elif __is_ecp_section(final_block, cgtos, symbol_to_atnum):
+        ecps = __parse_ecp_section(final_block, symbol_to_atnum)
         ecps = {ecp["atnum"]: ecp for ecp in ecps}
     else:
         raise ValueError("Found content after final '****' sequence, "
@@ -319,10 +322,14 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
     Note, that as of now potential ECP data present in the basis
     is ignored.
     """
-    lines = []
+    fmt_primitive = "{0:15.7f}             {1: #11.8G}\n".format
+    buf = io.StringIO()
+    write = buf.write
+    has_ecp = False
     for atom in data:
-        lines.append("****")
-        lines.append(elem_list[atom["atnum"]]["symbol"] + "     0")
+        has_ecp = has_ecp or "ecp" in atom
+        write("****\n")
+        write(elem_list[atom["atnum"]]["symbol"] + "     0\n")
         for fun in atom["functions"]:
             lfun = len(fun["coefficients"])
             if lfun != len(fun["exponents"]):
@@ -330,17 +337,14 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
                                  "in contraction specification need to agree.")
 
             am = NUMBER_TO_AM[fun["angular_momentum"]]
-            lines.append("{}   {}   1.00".format(am, lfun))
+            write("{}   {}   1.00\n".format(am, lfun))
 
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                lines.append("{0:15.7f}             {1: #11.8G}".format(exp, coeff))
-    lines.append("****\n")
+            for exp, coeff in zip(fun["exponents"], fun["coefficients"]):
+                write(fmt_primitive(exp, coeff))
+    write("****\n")
 
-    for atom in data:
-        if "ecp" in atom:
-            warn(dumps.__name__ + " currently ignores any ECP "
-                 "definitions parsed.")
-            break
+    if has_ecp:
+        warn(dumps.__name__ + " currently ignores any ECP "
+             "definitions parsed.")
 
-    return "\n".join(lines)
+    return buf.getvalue()
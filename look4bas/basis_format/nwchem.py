@@ -2,6 +2,7 @@
 from .. import elements
 from .constants import NUMBER_TO_AM
 from warnings import warn
+import io
 
 
 def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
@@ -18,11 +19,15 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
     Note, that as of now potential ECP data present in the basis
     is ignored.
     """
-    lines = []
-    lines.append("basis")
+    fmt_primitive = "    {0:15.7f}    {1: #11.9G}\n".format
+    buf = io.StringIO()
+    write = buf.write
+    write("basis\n")
+    has_ecp = False
     for atom in data:
+        has_ecp = has_ecp or "ecp" in atom
         elem = elem_list[atom["atnum"]]["symbol"]
-        lines.append("# {}".format(elem_list[atom["atnum"]]["name"]))
+        write("# {}\n".format(elem_list[atom["atnum"]]["name"]))
 
         for fun in atom["functions"]:
             lfun = len(fun["coefficients"])
@@ -31,19 +36,14 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
                                  "in contraction specification need to agree")
 
             am = NUMBER_TO_AM[fun["angular_momentum"]]
-            lines.append("  {}  {}".format(elem, am))
+            write("  {}  {}\n".format(elem, am))
 
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                fmt = "    {0:15.7f}    {1: #11.9G}"
-                lines.append(fmt.format(exp, coeff))
-    lines.append("end")
+            for exp, coeff in zip(fun["exponents"], fun["coefficients"]):
+                write(fmt_primitive(exp, coeff))
+    write("end\n")
 
-    for atom in data:
-        if "ecp" in atom:
-            warn(dumps.__name__ + " currently ignores any ECP "
-                 "definitions parsed.")
-            break
+    if has_ecp:
+        warn(dumps.__name__ + " currently ignores any ECP "
+             "definitions parsed.")
 
-    lines.append("")
-    return "\n".join(lines)
+    return buf.getvalue()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from .constants import NUMBER_TO_AM
 from warnings import warn
+import io
 
 
 def dumps(data, **kwargs):
@@ -17,10 +18,14 @@ def dumps(data, **kwargs):
     Note, that as of now potential ECP data present in the basis
     is ignored.
     """
-    lines = []
-    lines.append("%basis")
+    fmt_primitive = " {0:2d} {1:15.7f}    {2: #11.9G}\n".format
+    buf = io.StringIO()
+    write = buf.write
+    write("%basis\n")
+    has_ecp = False
     for atom in data:
-        lines.append("NewGTO {}".format(atom["atnum"]))
+        has_ecp = has_ecp or "ecp" in atom
+        write("NewGTO {}\n".format(atom["atnum"]))
         for fun in atom["functions"]:
             lfun = len(fun["coefficients"])
             if lfun != len(fun["exponents"]):
@@ -28,16 +33,16 @@ def dumps(data, **kwargs):
                                  "in contraction specification need to agree")
 
             am = NUMBER_TO_AM[fun["angular_momentum"]]
-            lines.append(" {}    {}".format(am, lfun))
+            write(" {}    {}\n".format(am, lfun))
 
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                fmt = " {0:2d} {1:15.7f}    {2: #11.9G}"
-                lines.append(fmt.format(i + 1, exp, coeff))
-        lines.append("end")
-        if "ecp" in atom:
-            warn(dumps.__name__ + " currently ignores any ECP "
-                 "definitions.")
-    lines.append("end")
+            for i, (exp, coeff) in enumerate(zip(fun["exponents"],
+                                                 fun["coefficients"]), start=1):
+                write(fmt_primitive(i, exp, coeff))
+        write("end\n")
+    write("end")
 
-    return "\n".join(lines)
+    if has_ecp:
+        warn(dumps.__name__ + " currently ignores any ECP "
+             "definitions.")
+
+    return buf.getvalue()
@@ -59,7 +59,9 @@ def convert_to(data, elem_list=elements.IUPAC_LIST):
     >>> mol.basis = convert_to(look4bas_data)
     """
     ret = {}
+    has_ecp = False
     for atom in data:
+        has_ecp = has_ecp or "ecp" in atom
         symbol = elem_list[atom["atnum"]]["symbol"]
 
         bdef = []
@@ -70,19 +72,16 @@ def convert_to(data, elem_list=elements.IUPAC_LIST):
             if len(fun["coefficients"]) != len(fun["exponents"]):
                 raise ValueError("Length of coefficients and length of exponents "
                                  "in contraction specification need to agree")
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                data_symbol.append([exp, coeff])
+            data_symbol.extend([exp, coeff] for exp, coeff
+                               in zip(fun["exponents"], fun["coefficients"]))
             bdef.append(data_symbol)
 
         bdef = optimize_contraction(bdef)
         bdef = remove_zeros(bdef)
         ret[symbol] = bdef
 
-    for atom in data:
-        if "ecp" in atom:
-            warn(convert_to.__name__ + " currently ignores any ECP "
-                 "definitions parsed.")
-            break
+    if has_ecp:
+        warn(convert_to.__name__ + " currently ignores any ECP "
+             "definitions parsed.")
 
     return ret
@@ -2,6 +2,7 @@
 from .. import elements
 from .constants import NUMBER_TO_AM
 from warnings import warn
+import io
 
 
 def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
@@ -18,16 +19,20 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
     Note, that as of now potential ECP data present in the basis
     is ignored.
     """
+    fmt_primitive = "{0:16.7f} {1: #16.8G}\n".format
     first = True
-    lines = []
-    lines.append("$basis")
+    buf = io.StringIO()
+    write = buf.write
+    write("$basis\n")
+    has_ecp = False
     for atom in data:
+        has_ecp = has_ecp or "ecp" in atom
         if first:
             first = False
         else:
-            lines.append("****")
+            write("****\n")
 
-        lines.append("{:>2s}  0".format(elem_list[atom["atnum"]]["symbol"]))
+        write("{:>2s}  0\n".format(elem_list[atom["atnum"]]["symbol"]))
         for fun in atom["functions"]:
             lfun = len(fun["coefficients"])
             if lfun != len(fun["exponents"]):
@@ -35,17 +40,14 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
                                  "in contraction specification need to agree.")
 
             am = NUMBER_TO_AM[fun["angular_momentum"]]
-            lines.append("{}{:4d}  1.00".format(am, lfun))
+            write("{}{:4d}  1.00\n".format(am, lfun))
 
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                lines.append("{0:16.7f} {1: #16.8G}".format(exp, coeff))
-    lines.append("$end")
+            for exp, coeff in zip(fun["exponents"], fun["coefficients"]):
+                write(fmt_primitive(exp, coeff))
+    write("$end")
 
-    for atom in data:
-        if "ecp" in atom:
-            warn(dumps.__name__ + " currently ignores any ECP "
-                 "definitions parsed.")
-            break
+    if has_ecp:
+        warn(dumps.__name__ + " currently ignores any ECP "
+             "definitions parsed.")
 
-    return "\n".join(lines)
+    return buf.getvalue()
@@ -2,6 +2,7 @@
 from .. import elements
 from .constants import NUMBER_TO_AM
 from warnings import warn
+import io
 
 
 def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
@@ -21,13 +22,17 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
     warn("Dumping basis sets in Turbomole format is experimental.")
     name = kwargs.get("name", "look4bas")
 
-    lines = []
-    lines.append("$basis")
+    fmt_primitive = "     {0:15.7f}    {1: #11.8G}\n".format
+    buf = io.StringIO()
+    write = buf.write
+    write("$basis\n")
+    has_ecp = False
     for atom in data:
-        lines.append("*")
+        has_ecp = has_ecp or "ecp" in atom
+        write("*\n")
         symbol = elem_list[atom["atnum"]]["symbol"].lower()
-        lines.append("{} {}".format(symbol, name))
-        lines.append("*")
+        write("{} {}\n".format(symbol, name))
+        write("*\n")
         for fun in atom["functions"]:
             lfun = len(fun["coefficients"])
             if lfun != len(fun["exponents"]):
@@ -35,18 +40,15 @@ def dumps(data, elem_list=elements.IUPAC_LIST, **kwargs):
                                  "in contraction specification need to agree.")
 
             am = NUMBER_TO_AM[fun["angular_momentum"]].lower()
-            lines.append("  {:3d}  {}".format(lfun, am))
+            write("  {:3d}  {}\n".format(lfun, am))
 
-            for i, coeff in enumerate(fun["coefficients"]):
-                exp = fun["exponents"][i]
-                lines.append("     {0:15.7f}    {1: #11.8G}".format(exp, coeff))
-    lines.append("*")
+            for exp, coeff in zip(fun["exponents"], fun["coefficients"]):
+                write(fmt_primitive(exp, coeff))
+    write("*\n")
 
-    for atom in data:
-        if "ecp" in atom:
-            warn(dumps.__name__ + " currently ignores any ECP "
-                 "definitions parsed.")
-            break
+    if has_ecp:
+        warn(dumps.__name__ + " currently ignores any ECP "
+             "definitions parsed.")
 
-    lines.append("$end")
-    return "\n".join(lines)
+    write("$end")
+    return buf.getvalue()
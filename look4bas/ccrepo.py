@@ -1,15 +1,43 @@
 #!/usr/bin/env python3
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 from . import tlsutil
 from .basis_format import gaussian94
+import concurrent.futures
+import functools
+import itertools
 import json
+import lxml.etree
+import lxml.html
 import re
 
 """ccrepo base url"""
 base_url = "https://grant-hill.group.shef.ac.uk/ccrepo"
 # https does not work
 
+"""Translation table for the whitespace characters normalised to spaces"""
+__whitespace_table = str.maketrans("\t\r\f\v\xa0", "     ")
+
+"""Search expression for the BASIS= line of a basis set definition"""
+__re_basis_line = re.compile("\nBASIS=[^\n]+\n")
+
+"""Search expression for the container class amongst further classes of an element"""
+__re_container_class = re.compile(r"(^|\s)container(\s|$)")
+
+"""XPath expression for the element cells of the periodic table"""
+__xpath_pertable_cells = lxml.etree.XPath(
+    './/*[contains(@class, "xs") or contains(@class, "xp") or contains(@class, "xd")'
+    ' or contains(@class, "xf") or contains(@class, "xg")]'
+)
+
+"""XPath expressions for the atomic number and the symbol inside an element cell"""
+__xpath_at_num = lxml.etree.XPath(
+    './/*[contains(concat(" ", normalize-space(@class), " "), " at_num ")]'
+)
+__xpath_symbol = lxml.etree.XPath(
+    './/*[contains(concat(" ", normalize-space(@class), " "), " symbol ")]'
+)
+
 
 class CcrepoError(Exception):
     """
@@ -20,43 +48,85 @@ class CcrepoError(Exception):
         super(CcrepoError, self).__init__(message)
 
 
+def _parse_html(ret):
+    """
+    Parse the html page of a response into an lxml tree. The raw content
+    is passed to the parser, such that it is decoded only once.
+    """
+    if ret.encoding is None:
+        # Without a charset from the headers leave the guessing to requests,
+        # since lxml would otherwise fall back to latin-1.
+        return lxml.html.fromstring(ret.text)
+    parser = lxml.html.HTMLParser(encoding=ret.encoding)
+    return lxml.html.fromstring(ret.content, parser=parser)
+
+
 def get_element_list():
     ret = tlsutil.get_tls_fallback(base_url)
     if not ret.ok:
         raise CcrepoError("Error downloading list of elements from ccrepo")
-    soup = BeautifulSoup(ret.text, "lxml")
+    root = _parse_html(ret)
 
-    table = soup.find_all(id="pertable")
+    table = root.xpath('//*[@id="pertable"]')
     if len(table) != 1:
         raise CcrepoError("Found more than one periodic table on the page")
     table = table[0]
 
     elements = []
-    for elem in table.find_all(class_=re.compile("xs|xp|xd|xf|xg")):
-        atnum = elem.find(class_="at_num")
-        sym = elem.find(class_="symbol")
+    for elem in __xpath_pertable_cells(table):
+        atnum = __xpath_at_num(elem)
+        sym = __xpath_symbol(elem)
 
-        if atnum is None or sym is None:
+        if not atnum or not sym:
             continue
+        atnum = atnum[0]
+        sym = sym[0]
 
         try:
-            atnum = int(atnum.text)
+            atnum = int(atnum.text_content())
         except TypeError as e:
             raise CcrepoError("Cannot interpret as atom number: " + str(e))
 
-        if "href" not in sym.a.attrs:
-            raise CcrepoError("No element link fund for " + sym.a.text)
-        name = sym.a["href"]
+        link = sym.find(".//a")
+        if "href" not in link.attrib:
+            raise CcrepoError("No element link fund for " + link.text_content())
+        name = link.attrib["href"]
         if name.endswith("index.html"):
             name = name[:-10]
         name = name.strip("/")
 
-        sym = sym.text
+        sym = sym.text_content()
         elem_obj = {"symbol": sym, "name": name, "atnum": atnum}
         elements.append(elem_obj)
     return elements
 
 
+def __iter_html_lines(tag):
+    """
+    Iterate over the lines of the html code of a tag, where <br/> is
+    taken as a line break as well. The first line, which starts with the
+    opening tag, is skipped. The children are serialised one by one,
+    such that stopping early avoids serialising the whole tag.
+    """
+    rest = None
+    for child in tag.children:
+        if isinstance(child, NavigableString):
+            html = child.output_ready()
+        else:
+            html = child.decode()
+        lines = html.replace("<br/>", "\n").split("\n")
+        if rest is not None:
+            lines[0] = rest + lines[0]
+            yield from lines[:-1]
+        elif len(lines) > 1:
+            yield from lines[1:-1]
+        else:
+            continue
+        rest = lines[-1]
+    if rest is not None:
+        yield rest + "</" + tag.name + ">"
+
+
 def get_basis_g94(element, basis):
     """
     Get info about a basis set for a particular
@@ -72,9 +142,16 @@ def get_basis_g94(element, basis):
         description   Basis set description
         definition     The basis set definition in Gaussian94 format
     """
-    sym = element["symbol"].lower()
-    ele = element["name"]
+    return dict(__download_basis_g94(element["symbol"].lower(), element["name"], basis))
 
+
+@functools.lru_cache(maxsize=256)
+def __download_basis_g94(sym, ele, basis):
+    """
+    Download and parse the basis set page for get_basis_g94. The results are
+    cached, such that the page downloaded for the description of a basis set
+    is not requested again once its definition is needed.
+    """
     payload = {"basis": basis, "program": "Gaussian"}
     page = base_url + "/" + ele + "/" + sym + "basis.php"
     ret = tlsutil.post_tls_fallback(page, data=payload)
@@ -82,10 +159,12 @@ def get_basis_g94(element, basis):
     if not ret.ok:
         raise CcrepoError("Error downloading page " + page)
 
-    if len(ret.text) == 0:
+    if len(ret.content) == 0:
         raise CcrepoError("Got unexpected empty page on " + page)
 
-    soup = BeautifulSoup(ret.text, "lxml")
+    # Only the container elements are needed, so skip building the rest of the tree
+    soup = BeautifulSoup(ret.content, "lxml", from_encoding=ret.encoding,
+                         parse_only=SoupStrainer(class_=__re_container_class))
     cont = soup.find_all(class_="container")
     if len(cont) == 0:
         raise CcrepoError("Found no container on page " + page)
@@ -94,30 +173,21 @@ def get_basis_g94(element, basis):
     cont = cont[0]
 
     # All basis set definition content sits in a nobr block
-    nobr = str(cont.nobr)
-    nobr = nobr.replace("<nobr>", "")
-    nobr = nobr.replace("</nobr>", "")
-    nobr = nobr.replace("<br/>", "\n")
-    nobr = nobr.replace("\n\n", "\n")
-    nobr = re.sub("[ \t\r\f\v\xa0]", " ", nobr)
-    nobr = nobr.replace("\n ", "\n")
-    nobr = nobr.strip("\n")
+    nobr = str(cont.nobr).translate(__whitespace_table)
+    nobr = nobr.replace("<nobr>", "").replace("</nobr>", "").replace("<br/>", "\n")
+    nobr = nobr.replace("\n\n", "\n").replace("\n ", "\n").strip("\n")
 
     # Replace the BASIS= line by ****
-    definition = re.sub("\nBASIS=[^\n]+\n", "\n****\n", nobr)
+    definition = __re_basis_line.sub("\n****\n", nobr)
 
     # Find prelines with reference and description
     # This is really messy, but essentially tries to
     # extract the first two lines of real text
-    cont_text = str(cont)
-    cont_text = cont_text.replace("<br/>", "\n")
-    prelines = []
-    for line in cont_text.split("\n"):
-        if len(line) == 0 or 'class="container"' in line:
-            continue
-        prelines.append(line.strip())
-        if len(prelines) == 2:
-            break
+    lines = (line.strip() for line in __iter_html_lines(cont)
+             if len(line) > 0 and 'class="container"' not in line)
+    prelines = list(itertools.islice(lines, 2))
+    if len(prelines) < 2:
+        raise CcrepoError("Found no reference and description on page " + page)
 
     reference = prelines[0]
     description = prelines[1]
@@ -140,11 +210,11 @@ def get_basis_sets_for_elem(element):
     if not ret.ok:
         raise CcrepoError("Error downloading list of elements from: "
                           + element["name"] + "/index.html")
-    soup = BeautifulSoup(ret.text, "lxml")
+    root = _parse_html(ret)
 
-    opt = soup.find_all(id="basis")
+    opt = root.xpath('//*[@id="basis"]')
     if len(opt) == 0:
-        pagetext = soup.text.strip()
+        pagetext = root.text_content().strip()
         if "not quite ready to go yet" in pagetext or \
            "no correlation consistent basis sets" in pagetext:
             # The page is not yet ready ... return empty dictionary
@@ -155,50 +225,75 @@ def get_basis_sets_for_elem(element):
         raise CcrepoError("Found more than one basis "
                           " field on the page " + page)
     opt = opt[0]
-    return {option.text: option["value"] for option in opt.find_all("option")}
+    return {option.text_content(): option.attrib["value"]
+            for option in opt.iter("option")}
 
 
-def add_to_database(db):
+def download_basisset_list(max_workers=8):
     """
-    Add the basis set definitions to the database
+    Download the list of elements and basis sets from ccrepo.
+    Returns a tuple of the element list and the list of basis set dictionaries
+
+    @param max_workers  Maximal number of pages to download concurrently
     """
     elements = get_element_list()
-    db.create_table_of_elements("ccrepo", elements)
-
-    # Obtain unique list of basis sets and the elements
-    # these are defined for
-    bases = dict()
-    for elem in elements:
-        bas = get_basis_sets_for_elem(elem)
-
-        for name in bas:
-            if name in bases:
-                bases[name]["atoms"].append(elem["atnum"])
-            else:
-                # Download the basis for this very element
-                # to obtain the description string
-                basdef = get_basis_g94(elem, bas[name])
-
-                bases[name] = {
-                    "name": name,
-                    "key":  bas[name],
-                    "atoms": [elem["atnum"]],
-                    "description": basdef["description"],
-                }
-    bases = list(bases.values())
-
-    # Now add all of these to the database:
-    for basset in bases:
-        extra = json.dumps({"key": basset["key"]})
-        basset_id = db.insert_basisset(basset["name"],
-                                       description=basset["description"],
-                                       source="ccrepo", extra=extra)
-        for atnum in basset["atoms"]:
+    elements_by_atnum = {elem["atnum"]: elem for elem in elements}
+
+    def get_description(basset):
+        # Download the basis for the first element it is defined for
+        # to obtain the description string
+        element = elements_by_atnum[basset["atoms"][0]]
+        return get_basis_g94(element, basset["key"])["description"]
+
+    # The pages listing the basis sets of each element are independent
+    # of another, so download them concurrently. Same for the pages
+    # with the descriptions afterwards.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        bases_per_elem = list(executor.map(get_basis_sets_for_elem, elements))
+
+        # Obtain unique list of basis sets and the elements
+        # these are defined for
+        bases = dict()
+        for elem, bas in zip(elements, bases_per_elem):
+            for name in bas:
+                basset = bases.setdefault(name, {"name": name, "key": bas[name],
+                                                 "atoms": []})
+                basset["atoms"].append(elem["atnum"])
+
+        descriptions = executor.map(get_description, bases.values())
+        for basset, description in zip(bases.values(), descriptions):
+            basset["description"] = description
+    return elements, list(bases.values())
+
+
+def insert_basisset_list(db, elements, bases):
+    """
+    Insert the element list and the basis sets obtained
+    from download_basisset_list into the database
+    """
+    with db.transaction():
+        db.create_table_of_elements("ccrepo", elements)
+
+        for basset in bases:
+            extra = json.dumps({"key": basset["key"]})
+            basset_id = db.insert_basisset(basset["name"],
+                                           description=basset["description"],
+                                           source="ccrepo", extra=extra)
             # TODO Add reference
-            db.insert_atom_to_basisset(basset_id, atnum, reference="")
+            db.insert_atoms_to_basisset(basset_id, basset["atoms"], reference="")
 
 
-def download_cgto_for_atoms(elem_list, bset_name, atnums, extra):
+def add_to_database(db, max_workers=8):
+    """
+    Add the basis set definitions to the database
+
+    @param max_workers  Maximal number of pages to download concurrently
+    """
+    elements, bases = download_basisset_list(max_workers=max_workers)
+    insert_basisset_list(db, elements, bases)
+
+
+def download_cgto_for_atoms(elem_list, bset_name, atnums, extra, max_workers=8):
     """
     Obtain the contracted Gaussian functions for the basis with the
     given name, the atom with the given atomic number as well
@@ -208,6 +303,7 @@ def download_cgto_for_atoms(elem_list, bset_name, atnums, extra):
     @param bset_name   Name of the basis set
     @param atnum  List of atomic numbers
     @param extra  Extra info required
+    @param max_workers  Maximal number of atoms to download concurrently
 
     Returns a list of dicts containing the following entries:
         atnum:     atomic number
@@ -218,12 +314,15 @@ def download_cgto_for_atoms(elem_list, bset_name, atnums, extra):
     """
     key = json.loads(extra)["key"]
 
-    ret = []
-    for atnum in atnums:
+    def download_atom(atnum):
         basdef = get_basis_g94(elem_list[atnum], key)["definition"]
 
-        # Parse obtained data and append to ret
+        # Parse obtained data
         basparsed = gaussian94.loads(basdef)
         assert len(basparsed) == 1
-        ret.append(basparsed[0])
-    return ret
+        return basparsed[0]
+
+    # ccrepo requires a separate request per atom, which are
+    # independent of another, so issue them concurrently.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(download_atom, atnums))
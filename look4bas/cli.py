@@ -30,6 +30,9 @@ def add_cmd_args_to(parser):
                         help="When downloading basis sets using --download store them in "
                         "this directory. (Default: '.', i.e. the current working "
                         "directory")
+    parser.add_argument("--jobs", "-j", default=4, type=int, metavar="n",
+                        help="Number of concurrent requests to use when downloading "
+                        "basis sets using --download. (Default: 4)")
 
     mode = parser.add_mutually_exclusive_group()
     mode.add_argument("--list", action='store_true', help="List the matching basis "
@@ -90,12 +93,18 @@ def cmd_post_parsing_cleanup(args):
     # TODO Ideally this should be directly integrated into the
     #      parsing done by argparse ... but I cannot be bothered right now.
 
+    if args.jobs < 1:
+        raise SystemExit("The number of jobs needs to be at least 1.")
+
     # If filtering for elements is requested, transform elements
     # to atomic numbers
-    elem_symbols_lower = [e["symbol"].lower() for e in elements.IUPAC_LIST]
+    symbol_to_atnum = {e["symbol"].lower(): e["atnum"] for e in elements.IUPAC_LIST}
 
     def to_atnum(sym):
-        return elem_symbols_lower.index(sym.lower())
+        try:
+            return symbol_to_atnum[sym.lower()]
+        except KeyError:
+            raise SystemExit("Unknown element symbol: {}".format(sym))
 
     if args.elements:
         args.elements = set(
@@ -106,10 +115,10 @@ def cmd_post_parsing_cleanup(args):
     # Build format list, by considering default and extra
     # and extending further flags if the user wants this
     if args.extra:
-        format_flags = config.format_flags["extra"]
+        format_flags = list(config.format_flags["extra"])
         args.extra = None  # Done with this flag
     else:
-        format_flags = config.format_flags["default"]
+        format_flags = list(config.format_flags["default"])
     if args.elements:
         format_flags.append("elements")
     if args.format is not None:
@@ -156,14 +165,13 @@ def download_results(args, data_base, findings):
     #
     #      or basis sets can be decontracted or ...
 
-    for bset in findings:
+    for bset in data_base.lookup_basissets_full(findings, max_workers=args.jobs):
         # TODO One could maybe use colour here as well with
         #      the colour scheme here and on display matching up
         source = display.colorise(bset["source"],
                                   config.source_to_colour.get(bset["source"]),
                                   **args.format)
-        print("Obtaining {:40s} (from {})".format(bset["name"], source))
-        bset = data_base.lookup_basisset_full(bset)
+        print("Obtained {:40s} (from {})".format(bset["name"], source))
         store.save_basisset(bset, args.download, args.destination)
 
 
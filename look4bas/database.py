@@ -1,16 +1,47 @@
 #!/usr/bin/env python3
 
 import codecs
+import contextlib
 import datetime
+import email.utils
+import functools
+import itertools
 import os
 import re
 import sqlite3 as sqlite
 
 
+"""Translation table escaping the wildcards of a LIKE pattern"""
+_like_escape_table = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+
+def _parse_http_date(date):
+    """
+    Parse a date as given in HTTP headers (e.g. Last-Modified)
+    into a naive datetime in UTC. Raises a ValueError on failure.
+    """
+    try:
+        ret = email.utils.parsedate_to_datetime(date)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid date '{}': {}".format(date, str(e)))
+    if ret.tzinfo is not None:
+        ret = ret.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return ret
+
+
 def capitalise(word):
     return word[0].upper() + word[1:]
 
 
+@functools.lru_cache(maxsize=256)
+def _compile_regex(expr, ignore_case=False):
+    """
+    Compile a regular expression. Since this is done for each row
+    a search is performed on, the compiled expressions are cached.
+    """
+    return re.compile(expr, flags=re.I if ignore_case else 0)
+
+
 def quote_identifier(s, errors="strict"):
     """
     Quote identifiers for sqlite (e.g. table names)
@@ -41,23 +72,74 @@ class Database:
         """
         self.dbfile = os.path.abspath(dbfile)
         self.conn = None
+        self._element_lists = {}  # Cache for lookup_element_list
+        self._element_keys = {}   # Cache for search_element
+        self._in_transaction = False
         self.connect(dbfile)
 
+    def __configure_connection(self):
+        # The database only caches data, which can be obtained again from
+        # the source sites, so trade durability on power loss for fewer fsyncs.
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.__register_user_functions()
+
+    def __create_indices(self, cur):
+        """
+        Create the indices for the columns used to join the tables
+        and to select basis sets by atoms, unless they exist already.
+        """
+        cur.execute("CREATE INDEX IF NOT EXISTS AtomPerBasisBasisSetID "
+                    "ON AtomPerBasis (BasisSetID)")
+        cur.execute("CREATE INDEX IF NOT EXISTS AtomPerBasisAtNum "
+                    "ON AtomPerBasis (AtNum)")
+        cur.execute("CREATE INDEX IF NOT EXISTS BasisFunctionsAtomBasisId "
+                    "ON BasisFunctions (AtomBasisId)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ContractionFunctionId "
+                    "ON Contraction (FunctionId)")
+
     def __register_user_functions(self):
         def matches(expr, item):
-            return re.search(expr, item) is not None
+            return _compile_regex(expr).search(item) is not None
         self.conn.create_function("MATCHES", 2, matches)
 
         def matchesi(expr, item):
-            return re.search(expr, item, flags=re.I) is not None
+            return _compile_regex(expr, ignore_case=True).search(item) is not None
         self.conn.create_function("MATCHESI", 2, matchesi)
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Context manager to group all database modifications inside
+        into a single transaction. The transaction is committed once the
+        outermost block is left and rolled back if an exception occurs.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        self._in_transaction = True
+        try:
+            with self.conn:
+                yield
+        finally:
+            self._in_transaction = False
+
+    def cache_clear(self):
+        """
+        Clear the in-memory caches of data looked up from the database.
+        """
+        self._element_lists.clear()
+        self._element_keys.clear()
+
     @property
     def timestamp(self):
-        if os.path.exists(self.dbfile) and not self.empty:
-            return datetime.datetime.fromtimestamp(os.path.getmtime(self.dbfile))
-        else:
-            return datetime.datetime.fromtimestamp(0)
+        """
+        Time of the last modification of the data in the database (in UTC),
+        i.e. the Last-Modified date of the archive it was downloaded from
+        or the time it was built from the source websites.
+        """
+        return self.get_meta_time("last_modified")
 
     def clear(self):
         """Clear the complete database and reset to untouched state"""
@@ -66,11 +148,12 @@ class Database:
             self.conn = None
         if os.path.isfile(self.dbfile):
             os.remove(self.dbfile)
+        self.cache_clear()
 
         dirname = os.path.dirname(self.dbfile)
         os.makedirs(dirname, exist_ok=True)
         self.conn = sqlite.connect(self.dbfile)
-        self.__register_user_functions()
+        self.__configure_connection()
 
         with self.conn:
             cur = self.conn.cursor()
@@ -111,15 +194,23 @@ class Database:
                         "Exponent REAL"        # Gaussian exponent
                         ")")
 
+            self.__create_indices(cur)
+
+            # Table of meta information about the database itself
+            cur.execute("CREATE TABLE Meta("
+                        "Key TEXT PRIMARY KEY, "
+                        "Value TEXT"
+                        ")")
+
             # Set value to db version to indicate initialisation
             cur.execute("PRAGMA user_version = {v:d}".format(v=self.database_version))
 
     @property
     def empty(self):
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
-            count = cur.execute("SELECT COUNT(*) FROM BasisSet").fetchone()[0]
-        return count == 0
+            row = cur.execute("SELECT 1 FROM BasisSet LIMIT 1").fetchone()
+        return row is None
 
     def close(self):
         """
@@ -141,6 +232,7 @@ class Database:
         if self.conn is not None:
             self.close()
         assert self.conn is None
+        self.cache_clear()
 
         if not os.path.isfile(dbfile):
             self.clear()
@@ -156,7 +248,75 @@ class Database:
                 self.clear()
             else:
                 self.conn = conn
-                self.__register_user_functions()
+                self.__configure_connection()
+
+                # Databases created by older versions (e.g. the downloaded
+                # archive) lack the indices, so add them if possible.
+                try:
+                    with self.conn:
+                        self.__create_indices(self.conn.cursor())
+                except sqlite.OperationalError:
+                    pass  # E.g. a read-only database file
+
+    def get_meta(self, key, default=None):
+        """
+        Get a value from the table of meta information about the database
+        (e.g. details about the place it was obtained from).
+        If the key is not present, default is returned.
+        """
+        with self.transaction():
+            cur = self.conn.cursor()
+
+            cur.execute("SELECT name FROM sqlite_master "
+                        "WHERE type='table' AND name='Meta'")
+            if cur.fetchone() is None:
+                return default
+
+            cur.execute("SELECT Value FROM Meta WHERE Key = ?", (key,))
+            res = cur.fetchone()
+        return default if res is None else res[0]
+
+    def set_meta(self, key, value):
+        """
+        Set a value in the table of meta information about the database.
+        """
+        if not isinstance(key, str):
+            raise TypeError("key needs to be a string")
+        if not isinstance(value, str):
+            raise TypeError("value needs to be a string")
+
+        with self.transaction():
+            cur = self.conn.cursor()
+            # Databases created by older versions do not have the table
+            cur.execute("CREATE TABLE IF NOT EXISTS Meta("
+                        "Key TEXT PRIMARY KEY, Value TEXT)")
+            cur.execute("INSERT OR REPLACE INTO Meta (Key, Value) VALUES (?, ?)",
+                        (key, value))
+
+    def get_meta_time(self, key):
+        """
+        Get a point in time from the table of meta information about the
+        database as a naive datetime in UTC. If the key is not present or
+        cannot be parsed, the epoch is returned.
+        """
+        value = self.get_meta(key)
+        if value is not None:
+            try:
+                return _parse_http_date(value)
+            except ValueError:
+                pass  # Treat as unknown
+        return datetime.datetime.utcfromtimestamp(0)
+
+    def set_meta_time(self, key, time=None):
+        """
+        Set a point in time (naive datetime in UTC, by default now)
+        in the table of meta information about the database.
+        The value is stored as an HTTP date.
+        """
+        if time is None:
+            time = datetime.datetime.utcnow()
+        time = time.replace(tzinfo=datetime.timezone.utc)
+        self.set_meta(key, email.utils.format_datetime(time, usegmt=True))
 
     def create_table_of_elements(self, source, elements):
         """
@@ -169,7 +329,9 @@ class Database:
             name:    Atom name
         """
         tablename = quote_identifier("Elements" + str(source))
-        with self.conn:
+        self._element_lists.pop(source, None)
+        self._element_keys.pop(source, None)
+        with self.transaction():
             cur = self.conn.cursor()
 
             # Drop the table if it exists
@@ -180,13 +342,12 @@ class Database:
                         "Name TEXT"      # Atom name
                         ")")
 
-            for elem in elements:
-                symbol = elem["symbol"].lower()
-                cur.execute(
-                    "INSERT INTO " + tablename + " "
-                    "(AtNum, Symbol, Name) VALUES (?, ?, ?)",
-                    (elem["atnum"], symbol, elem["name"])
-                )
+            cur.executemany(
+                "INSERT INTO " + tablename + " "
+                "(AtNum, Symbol, Name) VALUES (?, ?, ?)",
+                [(elem["atnum"], elem["symbol"].lower(), elem["name"])
+                 for elem in elements]
+            )
 
     def search_element(self, source, key):
         """
@@ -199,35 +360,26 @@ class Database:
         @param source  The source to search in (e.g. EMSL, ccrepo, IUPAC)
         @param key     The key to search for
         """
-        if isinstance(key, int):
-            query = "Atnum = ?"
-            args = [key]
-        elif isinstance(key, str):
-            query = "Name = ? OR Symbol = ?"
-            args = [key.lower(), key.lower()]
+        if isinstance(key, str):
+            lookup_key = key.lower()
+        elif isinstance(key, int):
+            lookup_key = key
         else:
             raise TypeError("Key may either be a string or an integer")
 
-        tablename = quote_identifier("Elements" + str(source))
-        with self.conn:
-            cur = self.conn.cursor()
-
-            cur.execute("SELECT name FROM sqlite_master "
-                        "WHERE type='table' AND name=" + tablename)
-            res = cur.fetchone()
-            if res is None:
-                raise ValueError("Unknown source {}".format(source))
-
-            cur.execute("SELECT * FROM " + tablename + " " + "WHERE " + query, args)
-            res = cur.fetchall()
+        # Index the cached element list by all keys, which can be searched for
+        if source not in self._element_keys:
+            element_keys = {}
+            for elem in self.lookup_element_list(source)[1:]:
+                for k in (elem["atnum"], elem["name"], elem["symbol"].lower()):
+                    element_keys.setdefault(k, {})[elem["atnum"]] = elem
+            self._element_keys[source] = element_keys
 
+        res = list(self._element_keys[source].get(lookup_key, {}).values())
         if len(res) == 0:
             raise ValueError("No element not found, which matches key {}".format(key))
         assert len(res) == 1
-        entry = res[0]
-
-        symbol = capitalise(entry[1])
-        return {"atnum": entry[0], "symbol": symbol, "name": entry[2]}
+        return dict(res[0])
 
     def lookup_element_list(self, source):
         """
@@ -235,9 +387,13 @@ class Database:
         source (e.g. EMSL, ccrepo, IUPAC).
 
         The first entry of the list is "X", which is a dummy place holder.
+        The list is cached, so repeated lookups do not query the database.
         """
+        if source in self._element_lists:
+            return self._element_lists[source]
+
         tablename = quote_identifier("Elements" + str(source))
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
 
             cur.execute("SELECT name FROM sqlite_master "
@@ -252,6 +408,7 @@ class Database:
             for atnum, symbol, name in cur.fetchall():
                 ret.append({"atnum": atnum, "name": name,
                             "symbol": capitalise(symbol)})
+        self._element_lists[source] = ret
         return ret
 
     def insert_basis_function(self, atbas_id, angular_momentum, coefficients, exponents):
@@ -265,32 +422,53 @@ class Database:
         @param coefficients  List of contraction coefficients
         @param exponents     List of contraction exponents
         """
+        self.insert_basis_functions(atbas_id, [{
+            "angular_momentum": angular_momentum,
+            "coefficients": coefficients,
+            "exponents": exponents,
+        }])
+
+    def insert_basis_functions(self, atbas_id, functions):
+        """
+        Insert a list of contracted basis functions for the provided element.
+        All functions are inserted within a single transaction.
+
+        @param atbas_id      ID of the atom for which functions should be added to the
+                             basis set
+        @param functions     List of dicts with the keys
+            angular_momentum  Angular momentum of the function
+            coefficients      List of contraction coefficients
+            exponents         List of contraction exponents
+        """
         if not isinstance(atbas_id, int):
             raise TypeError("atbas_id needs to be an integer")
-        if not isinstance(angular_momentum, int):
-            raise TypeError("angular_momentum needs to be an integer")
-        if len(coefficients) != len(exponents):
-            raise ValueError("Coefficients and exponents need to have the "
-                             "same length")
-        with self.conn:
+        for fun in functions:
+            if not isinstance(fun["angular_momentum"], int):
+                raise TypeError("angular_momentum needs to be an integer")
+            if len(fun["coefficients"]) != len(fun["exponents"]):
+                raise ValueError("Coefficients and exponents need to have the "
+                                 "same length")
+
+        with self.transaction():
             cur = self.conn.cursor()
 
-            cur.execute(
-                "INSERT INTO BasisFunctions (AtomBasisId, AngularMomentum)"
-                "VALUES (?, ?)", (atbas_id, angular_momentum)
-            )
-            function_id = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-            for i, coeff in enumerate(coefficients):
-                exp = exponents[i]
+            for fun in functions:
                 cur.execute(
+                    "INSERT INTO BasisFunctions (AtomBasisId, AngularMomentum)"
+                    "VALUES (?, ?)", (atbas_id, fun["angular_momentum"])
+                )
+                function_id = cur.lastrowid
+
+                cur.executemany(
                     "INSERT INTO Contraction "
                     "(FunctionId, Coefficient, Exponent) VALUES"
-                    "(?, ?, ?)", (function_id, coeff, exp)
+                    "(?, ?, ?)", [(function_id, coeff, exp) for coeff, exp
+                                  in zip(fun["coefficients"], fun["exponents"])]
                 )
 
             # Mark that the appropriate element has basis functions set in the db
-            cur.execute("UPDATE AtomPerBasis SET HasFunctions = 1 WHERE Id = ?", atbas_id)
+            cur.execute("UPDATE AtomPerBasis SET HasFunctions = 1 WHERE Id = ?",
+                        (atbas_id,))
 
     def lookup_basis_functions(self, atbas_id):
         """
@@ -304,27 +482,25 @@ class Database:
         if not isinstance(atbas_id, int):
             raise TypeError("atbas_id needs to be an integer")
 
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
             cur.execute("SELECT BasisFunctions.AngularMomentum, Contraction.FunctionId, "
                         "Contraction.Coefficient, Contraction.Exponent "
                         "FROM BasisFunctions "
                         "INNER JOIN Contraction ON BasisFunctions.Id = "
-                        "Contraction.FunctionId WHERE BasisFunctions.AtomBasisId = ?",
-                        (str(atbas_id),))
+                        "Contraction.FunctionId WHERE BasisFunctions.AtomBasisId = ? "
+                        "ORDER BY Contraction.FunctionId, Contraction.Id",
+                        (atbas_id,))
             contractions = cur.fetchall()
 
-            ret = {}
-            for am, fun_id, coeff, exp in contractions:
-                if fun_id not in ret:
-                    ret[fun_id] = {"coefficients": [coeff],
-                                   "exponents": [exp],
-                                   "angular_momentum": am, }
-                else:
-                    assert am == ret[fun_id]["angular_momentum"]
-                    ret[fun_id]["coefficients"].append(coeff)
-                    ret[fun_id]["exponents"].append(exp)
-        return list(ret.values())
+        # The rows of each function are adjacent due to the ordering
+        ret = []
+        for (am, _), rows in itertools.groupby(contractions, key=lambda row: row[:2]):
+            rows = list(rows)
+            ret.append({"coefficients": [row[2] for row in rows],
+                        "exponents": [row[3] for row in rows],
+                        "angular_momentum": am, })
+        return ret
 
     def insert_atom_to_basisset(self, basset_id, atnum, reference=""):
         """
@@ -343,15 +519,38 @@ class Database:
         if not isinstance(reference, str):
             raise TypeError("reference needs to be a string")
 
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
             cur.execute(
                 "INSERT INTO AtomPerBasis (BasisSetID, AtNum, Reference, HasFunctions)"
                 "VALUES (?, ?, ?, 0)", (basset_id, atnum, reference)
             )
-            rowid = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+            rowid = cur.lastrowid
         return rowid
 
+    def insert_atoms_to_basisset(self, basset_id, atnums, reference=""):
+        """
+        Insert a list of atoms for a particular basis set.
+        All atoms are inserted within a single transaction.
+
+        @param basset_id   ID of the basis set
+        @param atnums      List of atomic numbers
+        @param reference   A paper reference if available
+        """
+        if not isinstance(basset_id, int):
+            raise TypeError("basset_id needs to be an integer")
+        atnums = list(atnums)
+        if not all(isinstance(atnum, int) for atnum in atnums):
+            raise TypeError("atnums needs to be a list of integers")
+        if not isinstance(reference, str):
+            raise TypeError("reference needs to be a string")
+
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO AtomPerBasis (BasisSetID, AtNum, Reference, HasFunctions)"
+                "VALUES (?, ?, ?, 0)", ((basset_id, atnum, reference) for atnum in atnums)
+            )
+
     def insert_basisset(self, name, source, extra="", description=""):
         """
         Insert a new basis set.
@@ -370,32 +569,40 @@ class Database:
         if not isinstance(extra, str):
             raise TypeError("extra needs to be a string")
 
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
             cur.execute(
                 "INSERT INTO BasisSet (Name, Description, Source, Extra)"
                 "VALUES (?, ?, ?, ?)", (name, description, source, extra)
             )
-            rowid = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+            rowid = cur.lastrowid
         return rowid
 
+    """Query for the basis sets and their atoms, to be amended by a WHERE clause"""
+    _basisset_query = ("SELECT BasisSet.Id, BasisSet.Name, BasisSet.Description, "
+                       "BasisSet.Source, BasisSet.Extra, AtomPerBasis.Id, "
+                       "AtomPerBasis.AtNum, AtomPerBasis.HasFunctions "
+                       "FROM BasisSet LEFT JOIN AtomPerBasis "
+                       "ON AtomPerBasis.BasisSetID = BasisSet.Id ")
+
     def __ditcify_basisset_query_result(self, res):
         ret = {}
-        for row in res:
-            basset = ret.get(row[0], {"atoms": []})
-            basset["id"], basset["name"], basset["description"], \
-                basset["source"], basset["extra"], \
-                atbas_id, atnum, has_functions = row
-
-            if basset["id"] is None or atnum is None:
+        for basset_id, name, description, source, extra, \
+                atbas_id, atnum, has_functions in res:
+            if basset_id is None or atnum is None:
                 continue  # Skip rows with undefined fields
 
+            basset = ret.get(basset_id)
+            if basset is None:
+                basset = ret[basset_id] = {
+                    "atoms": [], "id": basset_id, "name": name,
+                    "description": description, "source": source, "extra": extra,
+                }
             basset["atoms"].append({
                 "atnum": atnum,
                 "atbas_id": atbas_id,
                 "has_functions": bool(has_functions)
             })
-            ret[row[0]] = basset
         return list(ret.values())
 
     def lookup_basisset(self, basisset):
@@ -421,15 +628,10 @@ class Database:
         else:
             raise TypeError("basset_id needs to be an integer or a dict")
 
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
 
-            cur.execute("SELECT BasisSet.Id, BasisSet.Name, BasisSet.Description, "
-                        "BasisSet.Source, BasisSet.Extra, AtomPerBasis.Id, "
-                        "AtomPerBasis.AtNum, AtomPerBasis.HasFunctions "
-                        "FROM BasisSet LEFT JOIN AtomPerBasis "
-                        "ON AtomPerBasis.BasisSetID = BasisSet.Id "
-                        "WHERE BasisSet.Id = ?", (str(basset_id),))
+            cur.execute(self._basisset_query + "WHERE BasisSet.Id = ?", (basset_id,))
             ret = self.__ditcify_basisset_query_result(cur.fetchall())
             assert len(ret) == 1
             return ret[0]
@@ -476,61 +678,77 @@ class Database:
         if not isinstance(has_atnums, list):
             raise TypeError("has_atnums needs to be a list")
 
-        if regex:
-            if ignore_case:
-                def match_field(field):
-                    return "matchesi(?, " + field + ")"
-            else:
-                def match_field(field):
-                    return "matches(?, " + field + ")"
-        else:
-            if ignore_case:
-                def match_field(field):
-                    return "instr(lower(" + field + "), lower(?))"
+        def match_field(field, text):
+            """
+            Return the SQL expression matching text against the field
+            and the argument to pass for its placeholder.
+            """
+            # Case-sensitive regular expressions without any special
+            # characters are literal strings, which are matched without the
+            # regex engine. This is not done for ignore_case, since re.I folds
+            # more characters than LIKE (e.g. "i" and "\u0130").
+            is_literal = not ignore_case and re.escape(text) == text
+
+            if regex and not is_literal:
+                if ignore_case:
+                    return "matchesi(?, " + field + ")", text
+                else:
+                    return "matches(?, " + field + ")", text
+            elif ignore_case:
+                # Like lower() the LIKE operator only folds ASCII characters,
+                # but it compares in place without building lowered copies.
+                text = text.translate(_like_escape_table)
+                return field + " LIKE ? ESCAPE '\\'", "%" + text + "%"
             else:
-                def match_field(field):
-                    return "instr(" + field + ", ?)"
-
-        prefix = ("SELECT BasisSet.Id, BasisSet.Name, BasisSet.Description, "
-                  "BasisSet.Source, BasisSet.Extra, AtomPerBasis.Id, "
-                  "AtomPerBasis.AtNum, AtomPerBasis.HasFunctions "
-                  "FROM BasisSet LEFT JOIN AtomPerBasis "
-                  "ON AtomPerBasis.BasisSetID = BasisSet.Id ")
+                return "instr(" + field + ", ?)", text
+
+        prefix = self._basisset_query
         postfix = " ORDER BY BasisSet.Name ASC"
         wheres = []
         args = []
 
-        if name is not None:
-            wheres.append(match_field("Name"))
-            args.append(name)
-        if description:
-            wheres.append(match_field("Description"))
-            args.append(description)
-        if pattern:
-            q = "( " + match_field("Description") + \
-                " OR " + match_field("Name") + " )"
-            wheres.append(q)
-            args.append(pattern)
-            args.append(pattern)
+        # The cheap exact matches come first, such that the
+        # string and regex matches only see the remaining rows
         if sources:
             q = "( " + " OR ".join(len(sources) * ["Source = ?"]) + " )"
             wheres.append(q)
             args.extend(sources)
         if has_atnums:
-            for atnum in has_atnums:
-                wheres.append(
-                    "BasisSet.Id IN (SELECT BasisSetID FROM AtomPerBasis WHERE AtNum = ?)"
-                )
-                if not isinstance(atnum, int):
-                    raise TypeError("All entries of has_atnums need to be integers")
-                args.append(atnum)
+            if not all(isinstance(atnum, int) for atnum in has_atnums):
+                raise TypeError("All entries of has_atnums need to be integers")
+
+            # Select the basis sets, which contain all requested atoms
+            # using a single grouped subquery
+            atnums = sorted(set(has_atnums))
+            wheres.append(
+                "BasisSet.Id IN (SELECT BasisSetID FROM AtomPerBasis WHERE AtNum IN ("
+                + ", ".join(len(atnums) * ["?"]) + ") GROUP BY BasisSetID "
+                "HAVING COUNT(DISTINCT AtNum) = ?)"
+            )
+            args.extend(atnums)
+            args.append(len(atnums))
+        if name is not None:
+            q, arg = match_field("Name", name)
+            wheres.append(q)
+            args.append(arg)
+        if description:
+            q, arg = match_field("Description", description)
+            wheres.append(q)
+            args.append(arg)
+        if pattern:
+            # The name is shorter, so try it first
+            q_name, arg = match_field("Name", pattern)
+            q_descr, arg = match_field("Description", pattern)
+            wheres.append("( " + q_name + " OR " + q_descr + " )")
+            args.append(arg)
+            args.append(arg)
 
         if wheres:
             query = prefix + " WHERE " + " AND ".join(wheres) + postfix
         else:
             query = prefix + postfix
 
-        with self.conn:
+        with self.transaction():
             cur = self.conn.cursor()
             cur.execute(query, args)
             return self.__ditcify_basisset_query_result(cur.fetchall())
@@ -1,33 +1,47 @@
 #!/usr/bin/env python3
 
+import itertools
 import shutil
 import re
 from . import elements
 
-__strip_ANSI_escapes = re.compile(r"""
+__re_ANSI_escape = re.compile(r"""
   \x1b     # literal ESC
   \[       # literal [
   [;\d]*   # zero or more digits or semicolons
   [A-Za-z] # a letter
-  """, re.VERBOSE).sub
+  """, re.VERBOSE)
+__strip_ANSI_escapes = __re_ANSI_escape.sub
 
 
 def printlen(s):
     """
     Return the printed length of a string
     """
+    if "\x1b" not in s:
+        return len(s)
     return len(__strip_ANSI_escapes("", s))
 
 
 def crop_to_printlen(s, l):
     """Return only as many characters such that the printed length
     of them is less than or equal l"""
+    if "\x1b" not in s:
+        return s[:l]
     if printlen(s) <= l:
         return s
-    i = l
-    while printlen(s[:i]) < l:
-        i += 1
-    return s[:i]
+
+    # Walk once over the escape sequences, counting
+    # the printed characters in between
+    count = 0
+    pos = 0
+    for m in __re_ANSI_escape.finditer(s):
+        n = m.start() - pos
+        if count + n >= l:
+            break
+        count += n
+        pos = m.end()
+    return s[:pos + l - count]
 
 
 # Flags to influence the way basis sets are listed and how thay should be transformed
@@ -73,7 +87,7 @@ def parse_format_flags(format_flags):
     ret = {}
 
     def negate_flag(flag):
-        return flag[3:] if flag.find("no-") == 0 else "no-" + flag
+        return flag[3:] if flag.startswith("no-") else "no-" + flag
 
     for flag in format_flags:
         if flag in __display_formats_base:
@@ -92,7 +106,8 @@ def print_basissets(findings, highlight_atnums=[],
                     source_to_colour=None):
     """
     Pretty print the basissets in the list
-    highlight_atnums    Highlight these elements in the list
+    highlight_atnums    Highlight these elements in the list (any iterable
+                        of atomic numbers or None)
     show_elements       Print the list of elements
     use_colour          Use colour for printing
     crop_fields         Crop the output if it is too wide
@@ -102,16 +117,22 @@ def print_basissets(findings, highlight_atnums=[],
     # Get IUPAC element list
     elem_list = elements.IUPAC_LIST
 
+    highlight = frozenset(highlight_atnums or ())
+
     def format_element_list(basset):
         """
         Take a basis set dictionary and return a formatted string
         of the element list, taking the list of atnums to highlight into account.
+        Consecutive highlighted elements share a single colour sequence.
         """
-        atnum_symbols = [(e["atnum"], elem_list[e["atnum"]]["symbol"])
-                         for e in basset["atoms"]]
-        return ",".join(colorise(sym, "yellow", use_colour=use_colour)
-                        if highlight_atnums and atnum in highlight_atnums
-                        else sym for atnum, sym in atnum_symbols)
+        parts = []
+        for highlighted, atoms in itertools.groupby(basset["atoms"],
+                                                    lambda e: e["atnum"] in highlight):
+            symbols = ",".join(elem_list[e["atnum"]]["symbol"] for e in atoms)
+            if highlighted:
+                symbols = colorise(symbols, "yellow", use_colour=use_colour)
+            parts.append(symbols)
+        return ",".join(parts)
 
     # Determine maximal lengths of the strings we have:
     maxlen_name = max(1, max(len(bset["name"]) for bset in findings))
@@ -119,8 +140,10 @@ def print_basissets(findings, highlight_atnums=[],
 
     # Ignore element string length if we don't care
     if show_elements:
-        maxlen_elem = max(printlen(format_element_list(bset)) for bset in findings)
+        element_lists = [format_element_list(bset) for bset in findings]
+        maxlen_elem = max(printlen(elemstr) for elemstr in element_lists)
     else:
+        element_lists = len(findings) * [""]
         maxlen_elem = 0
 
     # Adjust depending on width of terminal
@@ -141,7 +164,7 @@ def print_basissets(findings, highlight_atnums=[],
             maxlen_descr = rem
             maxlen_elem = 0
 
-    for bset in findings:
+    for bset, elemstr in zip(findings, element_lists):
         # Maxlen values for this basis set
         # if colour is used, these values need to be altered
         # since ANSI colour escapes produce no "length" but count as a char
@@ -150,7 +173,7 @@ def print_basissets(findings, highlight_atnums=[],
 
         fargs = {
             "description": bset["description"],
-            "elements": format_element_list(bset),
+            "elements": elemstr,
             "name": bset["name"],
         }
         if source_to_colour:
@@ -164,9 +187,11 @@ def print_basissets(findings, highlight_atnums=[],
                     if key in ["elements"]:
                         # Remove the half-printed element number after the last ","
                         icomma = fargs[key].rfind(",")
-                        fargs[key] = fargs[key][:icomma] + "..."
-                    else:
-                        fargs[key] += "..."
+                        fargs[key] = fargs[key][:icomma]
+                    if fargs[key].rfind("\x1b") > fargs[key].rfind(colours_ANSI["white"]):
+                        # Terminate the colour sequence, which has been cut
+                        fargs[key] += colours_ANSI["white"]
+                    fargs[key] += "..."
 
         for key in fargs:
             maxlen[key] += len(fargs[key]) - printlen(fargs[key])
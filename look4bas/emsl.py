@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import html
 import re
 from . import tlsutil
 from .basis_format import gaussian94
@@ -27,6 +28,24 @@ class EmslError(Exception):
 """Cache for the base url"""
 __base_url_cache = None
 
+"""Search expression for the quoted arguments of a basisSet definition line"""
+__re_quoted_string = re.compile('"[^"]*"')
+
+"""Search expression for the content of html script blocks"""
+__re_script = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.DOTALL | re.IGNORECASE)
+
+"""Search expression for script tags which define basisSet objects"""
+__re_bassets = re.compile(r"basisSets\[[0-9]+\]\W*=")
+
+"""Search expression for the table-row class amongst further classes of an element"""
+__re_table_row_class = re.compile(r"(^|\s)table-row(\s|$)")
+
+"""Search expression for the basisSet definition lines"""
+__re_basdef = re.compile(r"^\W*basisSets\[[0-9]+\]\W*=\W*new\W*basisSet")
+
+"""Search expression for the number of basis sets expected"""
+__re_num = re.compile(r"numBasis\W*=\W*([0-9]+)")
+
 
 def get_base_url():
     """
@@ -42,7 +61,8 @@ def get_base_url():
 
     if not ret.ok:
         raise EmslError("Error determining base url from {}.".format(portal_url))
-    soup = BeautifulSoup(ret.text, "lxml")
+    soup = BeautifulSoup(ret.content, "lxml", from_encoding=ret.encoding,
+                         parse_only=SoupStrainer("iframe"))
 
     iframe = soup.find("iframe", class_="chefContentIFrame")
     if iframe is None:
@@ -71,7 +91,7 @@ def _parse_basis_line(line):
     line = line[line.find(startstr) + len(startstr):line.rfind(endstr)]
 
     # And split into argument strings (without leading and tailling '"')
-    splitted = [m[1:-1] for m in re.findall('"[^"]*"', line)]
+    splitted = [m[1:-1] for m in __re_quoted_string.findall(line)]
 
     if len(splitted) != 11:
         raise ValueError("Invalid emsl basis line: " + line
@@ -97,6 +117,55 @@ def _parse_basis_line(line):
     }
 
 
+def _parse_script_block(text):
+    """
+    Parse the text of a script block and return the list of basis set
+    dictionaries defined in it. Script blocks which do not contain any
+    basisSet definitions yield an empty list.
+    """
+    # Ignore script html tags, which do not contain the string
+    # 'basisSets[number]=' in their text
+    if not __re_bassets.search(text):
+        return []
+    lines = text.splitlines()
+
+    numlines = [m.group(1) for m in map(__re_num.search, lines) if m]
+    if len(numlines) > 1:
+        raise EmslError("The string describing the number of basis sets is "
+                        "found more than once.")
+    expected_num_bases = int(numlines[0])
+
+    try:
+        bases = [_parse_basis_line(l) for l in lines if __re_basdef.match(l)]
+    except ValueError as e:
+        raise EmslError(e.args[0])
+
+    if (len(bases) != expected_num_bases):
+        raise EmslError("Deviation between expected number of basis definitions "
+                        "and the actual number found.")
+    return bases
+
+
+def _extract_pre_text(page):
+    """
+    Return the text content of the first pre block of an html page
+    or None if there is no such block.
+    """
+    # Fast path for a plain pre block without any markup inside,
+    # which is what EMSL returns. This avoids building a parse tree.
+    start = page.find("<pre>")
+    end = page.find("</pre>", start)
+    if start >= 0 and end >= 0:
+        content = page[start + len("<pre>"):end]
+        if "<" not in content:
+            # Normalise line endings like an html parser would
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+            return html.unescape(content)
+
+    soup = BeautifulSoup(page, "lxml", parse_only=SoupStrainer("pre"))
+    return None if soup.pre is None else soup.pre.text
+
+
 def download_basisset_list(return_elements=False):
     """
     Download and parse the list of basis sets from emsl
@@ -110,42 +179,14 @@ def download_basisset_list(return_elements=False):
 
     if not ret.ok:
         raise EmslError("Error downloading list of basis sets from emsl")
-    soup = BeautifulSoup(ret.text, "lxml")
 
     basis_sets = []  # The basis set list to return
 
-    # Search expression for script tags which define basisSet objects
-    re_bassets = re.compile(r"basisSets\[[0-9]+\]\W*=")
-
-    # Search expression for the basisSet definition lines:
-    re_basdef = re.compile(r"^\W*basisSets\[[0-9]+\]\W*=\W*new\W*basisSet")
-
-    # Search expression for the number of basis sets expected
-    re_num = re.compile(r"numBasis\W*=\W*([0-9]+)")
-
-    # Seek through all script blocks, which contain basis definitions:
-    for script in soup.find_all("script"):
-        # Ignore script html tags, which do not contain the string
-        # 'basisSets[number]=' in their text
-        if not re_bassets.search(script.text):
-            continue
-        lines = script.text.splitlines()
-
-        numlines = [re_num.search(l).group(1) for l in lines if re_num.search(l)]
-        if len(numlines) > 1:
-            raise EmslError("The string describing the number of basis sets is "
-                            "found more than once.")
-        expected_num_bases = int(numlines[0])
-
-        try:
-            bases = [_parse_basis_line(l) for l in lines if re_basdef.match(l)]
-        except ValueError as e:
-            raise EmslError(e.args[0])
-
-        if (len(bases) != expected_num_bases):
-            raise EmslError("Deviation between expected number of basis definitions "
-                            "and the actual number found.")
-        basis_sets.extend(bases)
+    # Seek through all script blocks, which contain basis definitions.
+    # These are cut out of the page directly, since building
+    # a full parse tree for this purpose is comparatively expensive.
+    for script in __re_script.finditer(ret.text):
+        basis_sets.extend(_parse_script_block(script.group(1)))
 
     if len(basis_sets) == 0:
         raise EmslError("No basis sets obtained from emsl bse data")
@@ -153,6 +194,9 @@ def download_basisset_list(return_elements=False):
     if not return_elements:
         return basis_sets
 
+    # Only build the tree for the rows of the periodic table
+    soup = BeautifulSoup(ret.text, "lxml",
+                         parse_only=SoupStrainer("div", class_=__re_table_row_class))
     elements = []  # The element list to return
     for div in soup.find_all(class_="table-row", name="div"):
         for elem in div.find_all(class_="elt", name="a"):
@@ -180,29 +224,40 @@ def download_basisset_list(return_elements=False):
     return elements, basis_sets
 
 
-def add_to_database(db):
+def insert_basisset_list(db, elements, lst):
     """
-    Add the basis set definitions to the database
+    Insert the element list and the basis sets obtained
+    from download_basisset_list into the database
     """
-    elements, lst = download_basisset_list(return_elements=True)
-    db.create_table_of_elements("EMSL", elements)
+    with db.transaction():
+        db.create_table_of_elements("EMSL", elements)
+
+        for bas in lst:
+            extra = json.dumps({"url": bas["url"]})
+            basset_id = db.insert_basisset(bas["name"], source="EMSL", extra=extra,
+                                           description=bas["description"])
+
+            atnums = []
+            for atom in bas["elements"]:
+                try:
+                    element = db.search_element("EMSL", atom)
+                except ValueError as e:
+                    if atom != "X":
+                        # atom == X is a known issue in some of the basis set definitions
+                        print("Skipping atom {}: ".format(atom) + str(e))
+                    continue
+                atnums.append(element["atnum"])
 
-    for bas in lst:
-        extra = json.dumps({"url": bas["url"]})
-        basset_id = db.insert_basisset(bas["name"], source="EMSL", extra=extra,
-                                       description=bas["description"])
+            # TODO Add reference
+            db.insert_atoms_to_basisset(basset_id, atnums, reference="")
 
-        for atom in bas["elements"]:
-            try:
-                element = db.search_element("EMSL", atom)
-            except ValueError as e:
-                if atom != "X":
-                    # atom == X is a known issue in some of the basis set definitions
-                    print("Skipping atom {}: ".format(atom) + str(e))
-                continue
 
-            # TODO Add reference
-            db.insert_atom_to_basisset(basset_id, element["atnum"], reference="")
+def add_to_database(db):
+    """
+    Add the basis set definitions to the database
+    """
+    elements, lst = download_basisset_list(return_elements=True)
+    insert_basisset_list(db, elements, lst)
 
 
 def download_cgto_for_atoms(elem_list, bset_name, atnums, extra):
@@ -243,17 +298,17 @@ def download_cgto_for_atoms(elem_list, bset_name, atnums, extra):
     ret = tlsutil.get_tls_fallback(url, params=params)
     if not ret.ok:
         raise EmslError("Error getting basis set " + bset_name + " from emsl.")
-    soup = BeautifulSoup(ret.text, "lxml")
 
     # The basis set should be encoded inside a pre tag
-    if soup.pre is None:
+    basdef = _extract_pre_text(ret.text)
+    if basdef is None:
         raise EmslError("No pre in result from emsl for basis set name " + bset_name)
-    if "$bsdata" in soup.pre.text:
+    if "$bsdata" in basdef:
         raise EmslError("Only found dummy content in pre element for basis set name "
                         + bset_name)
 
-    ret = gaussian94.loads(soup.pre.text, elem_list=elem_list)
+    ret = gaussian94.loads(basdef, elem_list=elem_list)
     if len(ret) < 1:
         raise AssertionError("Something went wrong parsing EMSL basis set text "
-                             "\n{}".format(soup.pre.text))
+                             "\n{}".format(basdef))
     return ret
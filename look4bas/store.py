@@ -4,9 +4,13 @@ from . import basis_format
 import os
 
 
+"""Translation table for the characters replaced by normalise_name"""
+__normalise_table = str.maketrans({"/": "I", " ": "_"})
+
+
 def normalise_name(name):
     """Normalise a basis set name to yield a valid filename"""
-    return name.lower().replace("/", "I").replace(" ", "_")
+    return name.lower().translate(__normalise_table)
 
 
 def save_basisset(bset, fmts, destination="."):
@@ -26,5 +30,16 @@ def save_basisset(bset, fmts, destination="."):
             print("   Warn: Skipping " + path + " since file already exists")
         else:
             print("   Saving to ", path)
-            with open(path, "w") as f:
-                f.write(data)
+
+            # Write to a temporary file first, such that an interrupted
+            # write does not leave a partial file, which would be skipped
+            # by the existence check above on the next run.
+            tmppath = path + ".tmp"
+            try:
+                with open(tmppath, "w") as f:
+                    f.write(data)
+                os.replace(tmppath, path)
+            except BaseException:
+                if os.path.exists(tmppath):
+                    os.remove(tmppath)
+                raise
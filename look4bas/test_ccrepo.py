@@ -0,0 +1,39 @@
+from bs4 import BeautifulSoup
+from . import ccrepo
+import unittest
+
+iter_html_lines = getattr(ccrepo, "__iter_html_lines")
+
+
+class TestIterHtmlLines(unittest.TestCase):
+    """
+    Test splitting the html of a tag into lines against serialising
+    the complete tag at once
+    """
+    def assert_same_lines(self, page):
+        div = BeautifulSoup(page, "lxml").div
+        reference = str(div).replace("<br/>", "\n").split("\n")[1:]
+        assert list(iter_html_lines(div)) == reference
+
+    def test_first_line_skipped(self):
+        self.assert_same_lines('<div class="container">H 0<br/>S 3 1.00<br/></div>')
+        self.assert_same_lines('<div>\nH 0\nS 3 1.00\n</div>')
+        self.assert_same_lines('<div><b>ref</b> text<br/>H 0</div>')
+        self.assert_same_lines('<div>only one line</div>')
+        self.assert_same_lines('<div></div>')
+
+    def test_comment_child(self):
+        self.assert_same_lines('<div>head<!-- a\ncomment -->\nH 0<br/>'
+                               '<!-- another -->S 3 1.00</div>')
+
+    def test_br_inside_text(self):
+        self.assert_same_lines('<div>\n#BASIS SET<br/>H     S<br/>      13.01  '
+                               '0.0196<br/><br/>\n<b>O</b>     S<br/>end\n</div>')
+
+    def test_entities(self):
+        self.assert_same_lines('<div>a &amp; b<br/>&lt;c&gt;\n1 &lt; 2</div>')
+
+    def test_stop_early(self):
+        div = BeautifulSoup("<div>skip<br/>" + "line<br/>" * 5 + "</div>", "lxml").div
+        lines = iter_html_lines(div)
+        assert [next(lines) for _ in range(3)] == ["line"] * 3
@@ -0,0 +1,230 @@
+import look4bas
+from . import elements
+import datetime
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+
+class TestDatabase(unittest.TestCase):
+    """
+    Test storing and looking up basis functions in a temporary database
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = look4bas.Database(os.path.join(self.tmpdir.name, "basis_sets.db"))
+        self.db.create_table_of_elements(
+            "EMSL", [e for e in elements.IUPAC_LIST if e["atnum"] > 0]
+        )
+        self.basset_id = self.db.insert_basisset(
+            "Def2-SVP", "EMSL", extra=json.dumps({"url": "def2-svp"}),
+            description="Double zeta"
+        )
+        self.db.insert_atoms_to_basisset(self.basset_id, [1, 6, 8])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    @staticmethod
+    def functions_for(atnum):
+        return [
+            {"angular_momentum": 0, "coefficients": [0.1, 0.5, 0.4],
+             "exponents": [30.0 * atnum, 5.0 * atnum, 1.0 * atnum]},
+            {"angular_momentum": 1, "coefficients": [1.0],
+             "exponents": [0.8 * atnum]},
+            {"angular_momentum": 0, "coefficients": [1.0],
+             "exponents": [0.1 * atnum]},
+        ]
+
+    def fake_download(self, elem_list, bset_name, atnums, extra):
+        assert bset_name == "Def2-SVP"
+        assert json.loads(extra) == {"url": "def2-svp"}
+        return [{"atnum": atnum, "functions": self.functions_for(atnum)}
+                for atnum in atnums]
+
+    def test_basis_functions_round_trip(self):
+        atoms = self.db.lookup_basisset(self.basset_id)["atoms"]
+        assert [at["atnum"] for at in atoms] == [1, 6, 8]
+        assert not any(at["has_functions"] for at in atoms)
+
+        carbon = [at for at in atoms if at["atnum"] == 6][0]
+        self.db.insert_basis_functions(carbon["atbas_id"], self.functions_for(6)[:2])
+        self.db.insert_basis_function(carbon["atbas_id"], **self.functions_for(6)[2])
+
+        atoms = self.db.lookup_basisset(self.basset_id)["atoms"]
+        assert [at["has_functions"] for at in atoms] == [False, True, False]
+        assert self.db.lookup_basis_functions(carbon["atbas_id"]) == self.functions_for(6)
+
+        hydrogen = [at for at in atoms if at["atnum"] == 1][0]
+        assert self.db.lookup_basis_functions(hydrogen["atbas_id"]) == []
+
+    def test_insert_basis_functions_invalid(self):
+        atbas_id = self.db.lookup_basisset(self.basset_id)["atoms"][0]["atbas_id"]
+        with self.assertRaises(ValueError):
+            self.db.insert_basis_functions(atbas_id, [{
+                "angular_momentum": 0, "coefficients": [1.0, 2.0], "exponents": [1.0]
+            }])
+        with self.assertRaises(TypeError):
+            self.db.insert_basis_functions(str(atbas_id), self.functions_for(1))
+        assert self.db.lookup_basis_functions(atbas_id) == []
+
+    def test_lookup_basisset_full_downloads_once(self):
+        with unittest.mock.patch.object(look4bas.emsl, "download_cgto_for_atoms",
+                                        side_effect=self.fake_download) as download:
+            bset = self.db.lookup_basisset_full(self.basset_id)
+            assert download.call_count == 1
+            assert download.call_args[0][2] == [1, 6, 8]
+            assert [at["atnum"] for at in bset["atoms"]] == [1, 6, 8]
+            for atom in bset["atoms"]:
+                assert atom["functions"] == self.functions_for(atom["atnum"])
+
+            # The functions are now stored in the database ...
+            atoms = self.db.lookup_basisset(self.basset_id)["atoms"]
+            assert all(at["has_functions"] for at in atoms)
+
+            # ... such that neither this object nor a fresh one downloads again
+            assert self.db.lookup_basisset_full(self.basset_id) == bset
+            fresh = look4bas.Database(self.db.dbfile)
+            assert fresh.lookup_basisset_full(self.basset_id) == bset
+            fresh.close()
+            assert download.call_count == 1
+
+    def test_meta(self):
+        assert self.db.get_meta("etag") is None
+        assert self.db.get_meta("etag", "default") == "default"
+
+        self.db.set_meta("etag", '"abc"')
+        self.db.set_meta("etag", '"def"')
+        assert self.db.get_meta("etag") == '"def"'
+
+        # Persisted on disk
+        fresh = look4bas.Database(self.db.dbfile)
+        assert fresh.get_meta("etag") == '"def"'
+        fresh.close()
+
+        with self.assertRaises(TypeError):
+            self.db.set_meta("etag", 1)
+
+    def test_timestamp_independent_of_writes(self):
+        epoch = datetime.datetime.utcfromtimestamp(0)
+        assert self.db.timestamp == epoch
+
+        self.db.set_meta("last_modified", "Wed, 21 Oct 2015 07:28:00 GMT")
+        assert self.db.timestamp == datetime.datetime(2015, 10, 21, 7, 28)
+
+        # Storing downloaded functions does not make the data any more recent
+        with unittest.mock.patch.object(look4bas.emsl, "download_cgto_for_atoms",
+                                        side_effect=self.fake_download):
+            self.db.lookup_basisset_full(self.basset_id)
+        assert self.db.timestamp == datetime.datetime(2015, 10, 21, 7, 28)
+
+        checked = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        self.db.set_meta_time("last_checked", checked)
+        assert self.db.get_meta_time("last_checked") == checked
+        assert self.db.get_meta_time("unknown") == epoch
+
+    def test_indices_added_to_existing_database(self):
+        def indices():
+            cur = self.db.conn.execute("SELECT name FROM sqlite_master "
+                                       "WHERE type = 'index' AND sql IS NOT NULL")
+            return sorted(row[0] for row in cur.fetchall())
+        expected = ["AtomPerBasisAtNum", "AtomPerBasisBasisSetID",
+                    "BasisFunctionsAtomBasisId", "ContractionFunctionId"]
+        assert indices() == expected
+
+        # Database files built without the indices obtain them on connect
+        with self.db.conn:
+            for index in expected:
+                self.db.conn.execute("DROP INDEX " + index)
+        self.db.connect()
+        assert indices() == expected
+
+        # Read-only database files can still be used
+        with self.db.conn:
+            self.db.conn.execute("DROP INDEX AtomPerBasisAtNum")
+        self.db.close()
+        os.chmod(self.db.dbfile, 0o444)
+        try:
+            self.db.connect()
+            if os.access(self.db.dbfile, os.W_OK):
+                return  # E.g. running as root
+            assert "AtomPerBasisAtNum" not in indices()
+            assert self.db.search_basisset(has_atnums=[6])[0]["name"] == "Def2-SVP"
+        finally:
+            os.chmod(self.db.dbfile, 0o644)
+
+
+class TestSearch(unittest.TestCase):
+    """
+    Test searching basis sets by name, description and atoms
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = look4bas.Database(os.path.join(self.tmpdir.name, "basis_sets.db"))
+        for name, source, description, atnums in [
+            ("Def2-SVP", "EMSL", "Double zeta valence", [1, 6, 8]),
+            ("cc-pVDZ", "ccrepo", "Dunning double zeta", [1, 6]),
+            ("6-31G*", "EMSL", "Pople", [1]),
+            ("50%_mix", "EMSL", "Mixture", [1]),
+            ("a_b", "EMSL", "Underscore", [8]),
+            ("back\\slash", "EMSL", "Backslash", [8]),
+            ("Äther", "EMSL", "Umlaut upper", [8]),
+            ("äther", "EMSL", "Umlaut lower", [8]),
+            ("\u0130stanbul", "EMSL", "Dotted capital I", [8]),
+        ]:
+            basset_id = self.db.insert_basisset(name, source, description=description)
+            self.db.insert_atoms_to_basisset(basset_id, atnums)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def names(self, **kwargs):
+        return sorted(bset["name"] for bset in self.db.search_basisset(**kwargs))
+
+    def test_wildcard_characters(self):
+        # The LIKE wildcards and the escape character are matched literally
+        for regex in (False, True):
+            assert self.names(name="%", ignore_case=True, regex=regex) == ["50%_mix"]
+            assert self.names(name="_", ignore_case=True,
+                              regex=regex) == ["50%_mix", "a_b"]
+            assert self.names(name="%_", ignore_case=True, regex=regex) == ["50%_mix"]
+            assert self.names(name="A_B", ignore_case=True, regex=regex) == ["a_b"]
+            assert self.names(name="A_B", regex=regex) == []
+        assert self.names(name="\\", ignore_case=True) == ["back\\slash"]
+        assert self.names(name="\\\\", ignore_case=True, regex=True) == ["back\\slash"]
+
+    def test_non_ascii(self):
+        # Plain substring searches only fold the case of ASCII characters,
+        # regular expressions ignore the case of all characters
+        assert self.names(name="äTHER") == []
+        assert self.names(name="äTHER", ignore_case=True) == ["äther"]
+        assert self.names(name="ä", regex=True) == ["äther"]
+        assert self.names(name="ä", ignore_case=True, regex=True) == ["Äther", "äther"]
+        assert self.names(name="ist", ignore_case=True) == []
+        assert self.names(name="ist", ignore_case=True, regex=True) == ["\u0130stanbul"]
+
+    def test_literal_and_regex(self):
+        assert self.names(name="cc-p.DZ", regex=True) == ["cc-pVDZ"]
+        assert self.names(name="cc-p.DZ") == []
+        assert self.names(name="6-31G*") == ["6-31G*"]
+        assert self.names(name="6-31G\\*", regex=True) == ["6-31G*"]
+        assert self.names(name="^def2", regex=True) == []
+        assert self.names(name="^def2", regex=True, ignore_case=True) == ["Def2-SVP"]
+        assert self.names(description="double", ignore_case=True) == \
+            ["Def2-SVP", "cc-pVDZ"]
+        assert self.names(pattern="D.*zeta", regex=True) == ["Def2-SVP", "cc-pVDZ"]
+        assert self.names(pattern="dunning|pople", regex=True, ignore_case=True) == \
+            ["6-31G*", "cc-pVDZ"]
+
+    def test_has_atnums(self):
+        assert self.names(has_atnums=[6, 1]) == ["Def2-SVP", "cc-pVDZ"]
+        assert self.names(has_atnums=[6, 1, 6, 1]) == ["Def2-SVP", "cc-pVDZ"]
+        assert self.names(has_atnums=[8, 8]) == \
+            ["Def2-SVP", "a_b", "back\\slash", "Äther", "äther", "\u0130stanbul"]
+        assert self.names(has_atnums=[1, 8, 2]) == []
+        assert self.names(has_atnums=[1, 1], sources=["ccrepo"]) == ["cc-pVDZ"]
+        assert self.names(has_atnums=[6], name="svp", ignore_case=True) == ["Def2-SVP"]
@@ -0,0 +1,29 @@
+from bs4 import BeautifulSoup
+from . import emsl
+import unittest
+
+
+class TestExtractPreText(unittest.TestCase):
+    """
+    Test extracting the pre block of an html page against BeautifulSoup
+    """
+    def assert_same_text(self, page):
+        pre = BeautifulSoup(page, "lxml").pre
+        assert emsl._extract_pre_text(page) == (None if pre is None else pre.text)
+
+    def test_plain(self):
+        self.assert_same_text("<html><body><pre>\nH     S\n  13.01  0.0196\n****\n"
+                              "</pre></body></html>")
+        self.assert_same_text("<html><body><p>No basis set</p></body></html>")
+
+    def test_entities(self):
+        self.assert_same_text("<pre>a &amp; b &lt;c&gt; &#39;d&#39; &quot;e&quot;</pre>")
+
+    def test_line_endings(self):
+        self.assert_same_text("<pre>\r\nH     S\r\n  13.01  0.0196\r****\r\n</pre>")
+
+    def test_markup_fallback(self):
+        self.assert_same_text("<pre>H <b>S</b>\n  13.01 &amp; 0.0196</pre>")
+        self.assert_same_text('<pre class="basis">H     S\n</pre>')
+        self.assert_same_text("<PRE>H     S\n</PRE>")
+        self.assert_same_text("<p>x</p><pre>first</pre><pre>second</pre>")
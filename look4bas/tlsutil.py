@@ -2,6 +2,9 @@
 import requests
 import requests.adapters
 import ssl
+import threading
+import urllib.parse
+from urllib3.util.retry import Retry
 
 
 class TLSLowerAdapter(requests.adapters.HTTPAdapter):
@@ -26,15 +29,69 @@ class TLSv1_2Adapter(TLSLowerAdapter):
     ssl_version = ssl.PROTOCOL_TLSv1_2
 
 
+"""Maximal number of connections kept alive per host and session"""
+pool_maxsize = 20
+
+"""Timeout in seconds used for requests, unless specified otherwise"""
+timeout = 30
+
+"""Number of times failed connections or server errors are retried"""
+max_retries = 3
+
+"""Sessions for each adapter type, such that connections can be reused"""
+__sessions = {}
+__sessions_lock = threading.Lock()
+
+"""Adapter type to use for hosts, where the default adapter failed"""
+__host_adapters = {}
+
+
+def get_session(adapter=requests.adapters.HTTPAdapter):
+    """
+    Return the session object, which is used to perform requests
+    with the given adapter type. The session is created on first use
+    and kept afterwards, such that connections (and in particular
+    the TLS handshakes) are reused between subsequent requests.
+    """
+    with __sessions_lock:
+        if adapter not in __sessions:
+            # Transient errors are retried with a backoff. SSL errors are
+            # not retried (other=0), since they trigger the TLS fallback.
+            retry = Retry(total=max_retries, other=0, backoff_factor=0.3,
+                          status_forcelist=(500, 502, 503, 504),
+                          raise_on_status=False)
+            session = requests.Session()
+            session.mount("https://", adapter(pool_maxsize=pool_maxsize,
+                                              max_retries=retry))
+            if adapter is requests.adapters.HTTPAdapter:
+                session.mount("http://", adapter(pool_maxsize=pool_maxsize,
+                                                 max_retries=retry))
+            __sessions[adapter] = session
+        return __sessions[adapter]
+
+
 def method_tls_fallback(url, method, *args, **kwargs):
     """
     Try to perform a method on an url using requests.
     If the get request fails due to an SSLError, we try to lower
     the TLS version until it finally succeeds.
     """
+    kwargs.setdefault("timeout", timeout)
+
+    # If we had to fall back for this host before, directly use
+    # the adapter which worked instead of retrying all handshakes
+    host = urllib.parse.urlsplit(url).netloc
+    adapter = __host_adapters.get(host)
+    if adapter is not None:
+        try:
+            session = get_session(adapter)
+            return getattr(session, method)(url, *args, **kwargs)
+        except requests.exceptions.SSLError:
+            __host_adapters.pop(host, None)
+
     # Try to get as-is
     try:
-        session = requests.Session()
+        session = get_session()
         return getattr(session, method)(url, *args, **kwargs)
     except requests.exceptions.SSLError:
         pass
@@ -42,9 +99,10 @@ def method_tls_fallback(url, method, *args, **kwargs):
     err = None
     for adapter in [TLSv1_2Adapter, TLSv1_1Adapter, TLSv1Adapter]:
         try:
-            session = requests.Session()
-            session.mount("https://", adapter())
-            return getattr(session, method)(url, *args, **kwargs)
+            session = get_session(adapter)
+            ret = getattr(session, method)(url, *args, **kwargs)
+            __host_adapters[host] = adapter
+            return ret
         except requests.exceptions.SSLError as e:
             err = e
     raise err
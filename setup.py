@@ -47,6 +47,7 @@ setup(
     python_requires='>=3.5',
     install_requires=[
         'requests (>=2.2)',
+        'urllib3 (>= 1.26)',
         'beautifulsoup4 (>= 4.2)',
         'lxml (>= 4.2)'
     ],